@@ -0,0 +1,189 @@
+"""
+Breach actions for Privacy Guard System
+
+The platform specific work (closing, minimizing and focusing windows) sits behind
+an ActionBackend so the breach handling can run and be measured on any OS.
+"""
+
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ActionBackend:
+    """Interface for the platform specific breach actions"""
+
+    name = "base"
+
+    def start(self):
+        """Prepare any warm state kept between breaches"""
+
+    def stop(self):
+        pass
+
+    def close_and_minimize(self, app_list, protected_list, close_names, timeout=2.0):
+        """Close `close_names`, minimize other windows; returns (closed_apps, minimized_titles).
+
+        Processes still running `timeout` seconds after terminate are killed.
+        """
+        raise NotImplementedError
+
+    def launch_or_activate_app(self, app_name):
+        """Bring `app_name` to the front, launching it if needed; returns True on success"""
+        raise NotImplementedError
+
+
+class WindowsActionBackend(ActionBackend):
+    """Real actions through psutil and pywin32.
+
+    Keeps a background ProcessIndex so a breach resolves its target processes
+    without walking the whole process list.
+    """
+
+    name = "windows"
+
+    def __init__(self, index_interval=2.0):
+        self.index_interval = index_interval
+        self.process_index = None
+
+    def start(self):
+        from utils import ProcessIndex
+        if self.process_index is None:
+            self.process_index = ProcessIndex(self.index_interval)
+            self.process_index.start()
+
+    def stop(self):
+        if self.process_index is not None:
+            self.process_index.stop()
+            self.process_index = None
+
+    def close_and_minimize(self, app_list, protected_list, close_names, timeout=2.0):
+        from utils import close_and_minimize
+        return close_and_minimize(app_list, protected_list, close_names, self.process_index, timeout)
+
+    def launch_or_activate_app(self, app_name):
+        from utils import launch_or_activate_app
+        return launch_or_activate_app(app_name, self.process_index)
+
+
+class FakeActionBackend(ActionBackend):
+    """Records calls instead of touching windows or processes.
+
+    `delay` simulates how long the real actions take, `running` is the list of
+    process names pretended to be open.
+    """
+
+    name = "fake"
+
+    def __init__(self, delay=0.0, running=None):
+        self.delay = delay
+        self.running = list(running or [])
+        self.calls = []
+
+    def close_and_minimize(self, app_list, protected_list, close_names, timeout=2.0):
+        self.calls.append(('close_and_minimize', tuple(close_names)))
+        if self.delay:
+            time.sleep(self.delay)
+        close_lower = {name.lower() for name in close_names}
+        closed = [name for name in self.running if name.lower() in close_lower]
+        return closed, []
+
+    def launch_or_activate_app(self, app_name):
+        self.calls.append(('launch_or_activate_app', app_name))
+        return True
+
+
+def create_action_backend(name="auto", index_interval=2.0):
+    """Backend by name: 'windows', 'fake' or 'auto' (windows on Windows, fake elsewhere)"""
+    if name == "auto":
+        name = "windows" if sys.platform == "win32" else "fake"
+    if name == "windows":
+        return WindowsActionBackend(index_interval)
+    if name == "fake":
+        return FakeActionBackend()
+    raise ValueError(f"Unknown action backend: {name}")
+
+
+class BreachActionWorker:
+    """Single long-lived thread running breach actions one at a time.
+
+    Breaches reported while an action is running are merged into one follow-up
+    run instead of piling up overlapping threads. Each run records the time from
+    the earliest merged detection to the completed action.
+    """
+
+    def __init__(self, action, on_complete=None):
+        self.action = action
+        # Optional callback(latency, duration) after each run
+        self.on_complete = on_complete
+        self.cond = threading.Condition()
+        self.pending = []
+        self.running = False
+        self.busy = False
+        self.thread = None
+        # Statistics
+        self.runs = 0
+        self.coalesced = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="PrivacyGuardActions", daemon=True)
+        self.thread.start()
+
+    def submit(self, detected_at=None):
+        """Report a breach detected at `detected_at` (perf_counter, default now)"""
+        with self.cond:
+            self.pending.append(detected_at if detected_at is not None else time.perf_counter())
+            self.cond.notify()
+
+    def run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.pending or not self.running)
+                if not self.running:
+                    return
+                events, self.pending = self.pending, []
+                self.busy = True
+            self.coalesced += len(events) - 1
+            started = time.perf_counter()
+            try:
+                self.action()
+            except Exception as e:
+                logger.error(f"Breach action failed: {e}")
+            finished = time.perf_counter()
+            latency = finished - min(events)
+            self.runs += 1
+            self.last_latency = latency
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            logger.info(f"Breach action completed {latency * 1000:.0f} ms after detection"
+                        + (f" ({len(events)} breaches merged)" if len(events) > 1 else ""))
+            if self.on_complete:
+                self.on_complete(latency, finished - started)
+            with self.cond:
+                self.busy = False
+                self.cond.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """Wait until no action is pending or running"""
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pending and not self.busy, timeout)
+
+    def stop(self, timeout=5.0):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def summary(self):
+        avg_ms = self.total_latency / self.runs * 1000 if self.runs else 0.0
+        return (f"{self.runs} runs, {self.coalesced} breaches merged, detection-to-action "
+                f"avg {avg_ms:.0f} ms / max {self.max_latency * 1000:.0f} ms")
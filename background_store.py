@@ -0,0 +1,76 @@
+"""
+Persisted background models for Privacy Guard System
+
+The learned MOG2 background (a blurred grayscale image at processing size) is
+saved per source and detection geometry, so the next start can restore it
+instead of learning the scene from scratch.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundStore:
+    """PNG + JSON pairs under `directory`, ignored once older than `max_age_hours`"""
+
+    def __init__(self, directory="models", max_age_hours=12):
+        self.directory = directory
+        self.max_age_hours = max_age_hours
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('background_dir'), config.get('background_max_age_hours'))
+
+    @staticmethod
+    def key(source, frame_size, config):
+        """Name for a source at a capture size under the current detection settings"""
+        settings = json.dumps([config.get('processing_resolution'), config.get('detection_roi'),
+                               config.get('detector'), config.get('detect_shadows')])
+        digest = hashlib.sha1(settings.encode()).hexdigest()[:8]
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', str(source)).strip('_')
+        width, height = frame_size or (0, 0)
+        return f"{name}_{width}x{height}_{digest}"
+
+    def paths(self, key):
+        base = os.path.join(self.directory, f"background_{key}")
+        return base + ".png", base + ".json"
+
+    def load(self, key):
+        """Saved background or None when missing or stale"""
+        image_path, meta_path = self.paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        age_hours = (time.time() - meta.get('saved_at', 0)) / 3600
+        if age_hours > self.max_age_hours:
+            logger.info(f"Saved background {key} is {age_hours:.1f}h old, ignoring it")
+            return None
+        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            return None
+        return image
+
+    def save(self, key, image):
+        if image is None:
+            return False
+        image_path, meta_path = self.paths(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if not cv2.imwrite(image_path, image):
+                raise IOError("imwrite failed")
+            with open(meta_path, 'w') as f:
+                json.dump({'saved_at': time.time(), 'shape': list(image.shape)}, f)
+        except (OSError, IOError) as e:
+            logger.warning(f"Cannot save background {key}: {e}")
+            return False
+        return True
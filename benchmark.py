@@ -0,0 +1,617 @@
+"""
+Offline replay benchmark for the Privacy Guard detection pipeline
+
+Drives PrivacyGuard.detect_motion over recorded footage or the synthetic scene as
+fast as possible, with no display, pacing or breach actions, so the numbers show
+the detector's own cost.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import psutil
+
+from frame_sources import SyntheticSource, open_frame_source
+
+DEFAULT_SYNTHETIC_FRAMES = 900
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes"""
+    info = psutil.Process().memory_info()
+    peak = getattr(info, 'peak_wset', None)  # Windows
+    if peak is None:
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+            if sys.platform != 'darwin':
+                peak *= 1024
+        except ImportError:
+            peak = info.rss
+    return peak
+
+
+def open_bench_source(spec, frames=None):
+    """Open an unpaced, non-looping source for replay"""
+    if spec == "synthetic" or str(spec).startswith("synthetic:"):
+        seed = int(spec.split(":", 1)[1]) if ":" in spec else 0
+        source = SyntheticSource(frames=frames or DEFAULT_SYNTHETIC_FRAMES, seed=seed)
+        return source if source.open() else None
+    return open_frame_source(spec)
+
+
+def replay(spec, detect, frames=None):
+    """Run `detect` over every frame of a source, returns per-frame latencies and decisions.
+
+    Frames are streamed rather than preloaded so peak RSS reflects the pipeline and
+    not the clip; decoding time is excluded from the latencies.
+    """
+    source = open_bench_source(spec, frames)
+    if source is None:
+        return None
+    latencies = []
+    decisions = []
+    size = None
+    start = time.perf_counter()
+    while frames is None or len(latencies) < frames:
+        ret, frame = source.read()
+        if not ret:
+            break
+        size = (frame.shape[1], frame.shape[0])
+        t0 = time.perf_counter()
+        decisions.append(bool(detect(frame)))
+        latencies.append(time.perf_counter() - t0)
+    wall_time = time.perf_counter() - start
+    source.release()
+    if not latencies:
+        return None
+    return {
+        'frames': len(latencies),
+        'size': size,
+        'wall_time': wall_time,
+        'latencies': np.array(latencies),
+        'decisions': np.array(decisions, dtype=bool),
+    }
+
+
+def measure_frame_churn(spec, detect, frames=300, reuse=True):
+    """Transient allocation per frame and GC collections for the capture/last-frame path.
+
+    reuse=False mimics the old loop: read() into a fresh array and keep
+    last_frame as a copy. reuse=True is the current path: read into ring buffer
+    slots and keep a reference to the claimed slot.
+    """
+    from capture import FrameRingBuffer
+
+    source = open_bench_source(spec, frames)
+    if source is None:
+        return None
+    size = source.frame_size()
+    ring = FrameRingBuffer(3, (size[1], size[0], 3) if size else None)
+    collections = [0]
+
+    def count_collection(phase, info):
+        if phase == 'start':
+            collections[0] += 1
+
+    transient = []
+    gc.callbacks.append(count_collection)
+    tracemalloc.start()
+    try:
+        for _ in range(frames):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            if reuse:
+                index, buffer = ring.acquire_write_slot()
+                ret, frame = source.read(buffer)
+                if not ret:
+                    break
+                ring.publish(index, frame, time.perf_counter())
+                last_frame = ring.get_latest().frame
+            else:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                last_frame = frame.copy()
+            detect(last_frame)
+            transient.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+        gc.callbacks.remove(count_collection)
+        source.release()
+    if not transient:
+        return None
+    return {
+        'frames': len(transient),
+        'alloc_kb_per_frame': float(np.mean(transient)) / 1024,
+        'gc_collections': collections[0],
+    }
+
+
+def count_events(decisions):
+    """Number of separate motion episodes (rising edges) in a decision sequence"""
+    if len(decisions) == 0:
+        return 0
+    return int(decisions[0]) + int(np.count_nonzero(decisions[1:] & ~decisions[:-1]))
+
+
+def summarize(result):
+    """Throughput and latency percentiles for a replay result"""
+    latencies = result['latencies'] * 1000
+    total = float(result['latencies'].sum()) or 1e-9
+    return {
+        'frames': result['frames'],
+        'fps': result['frames'] / total,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+        'motion_frames': int(np.count_nonzero(result['decisions'])),
+        'detections': count_events(result['decisions']),
+    }
+
+
+def print_summary(title, stats):
+    print(f"\n📊 {title}")
+    print("-" * 50)
+    print(f"Frames processed:  {stats['frames']}")
+    print(f"Throughput:        {stats['fps']:.1f} FPS")
+    print(f"Latency p50/p95/p99: {stats['p50_ms']:.2f} / {stats['p95_ms']:.2f} / {stats['p99_ms']:.2f} ms"
+          f" (max {stats['max_ms']:.2f} ms)")
+    print(f"Motion frames:     {stats['motion_frames']}")
+    print(f"Detections:        {stats['detections']}")
+
+
+def compare_decisions(decisions, reference):
+    """Agreement between two decision sequences over the same frames"""
+    count = min(len(decisions), len(reference))
+    decisions, reference = decisions[:count], reference[:count]
+    # A reference motion episode is missed if no frame inside it was flagged
+    missed = 0
+    in_event = False
+    hit = False
+    for flagged, expected in zip(decisions, reference):
+        if expected:
+            if not in_event:
+                in_event, hit = True, False
+            hit = hit or flagged
+        elif in_event:
+            missed += not hit
+            in_event = False
+    if in_event and not hit:
+        missed += 1
+    return {
+        'agreement': float(np.mean(decisions == reference)) if count else 1.0,
+        'extra_frames': int(np.count_nonzero(decisions & ~reference)),
+        'missed_frames': int(np.count_nonzero(~decisions & reference)),
+        'missed_events': missed,
+        'reference_events': count_events(reference),
+    }
+
+
+def print_comparison(title, comparison):
+    print(f"\n🔍 {title}")
+    print("-" * 50)
+    print(f"Frame agreement:   {comparison['agreement'] * 100:.1f}%")
+    print(f"Extra motion frames:  {comparison['extra_frames']}")
+    print(f"Missed motion frames: {comparison['missed_frames']}")
+    print(f"Missed detections: {comparison['missed_events']} of {comparison['reference_events']}")
+
+
+def run_benchmark(spec, frames=None, resolution=None):
+    """Replay a clip through PrivacyGuard.detect_motion and print the results"""
+    from privacy_guard import PrivacyGuard
+
+    print(f"⏱️  Replaying {spec} through detect_motion...")
+    guard = PrivacyGuard()
+    if resolution is not None:
+        guard.config.set('processing_resolution', resolution, save=False)
+        guard.reset_motion_engine()
+    reduced = guard.config.get('processing_resolution') or guard.config.get('detection_roi')
+    prefilter = guard.config.get('motion_prefilter')
+    if reduced:
+        print(f"Processing resolution: {guard.config.get('processing_resolution') or 'capture size'}, "
+              f"ROI: {guard.config.get('detection_roi') or 'full frame'}")
+    result = replay(spec, guard.detect_motion, frames)
+    if result is None:
+        print(f"❌ Cannot read frames from {spec}")
+        return None
+    stats = summarize(result)
+    print(f"Source resolution: {result['size'][0]}x{result['size'][1]}")
+    stats['peak_rss_mb'] = peak_rss_bytes() / (1024 * 1024)
+    print_summary("detect_motion replay", stats)
+    print(f"Replay FPS (incl. decode): {result['frames'] / result['wall_time']:.1f}")
+    print(f"Peak RSS:          {stats['peak_rss_mb']:.1f} MB")
+    churn_frames = min(frames or 300, 300)
+    print(f"\n🧮 Frame handling churn (tracemalloc, {churn_frames} frames)")
+    print("-" * 50)
+    for label, reuse in (("fresh read + copy (old)", False), ("ring buffer reuse", True)):
+        churn = measure_frame_churn(spec, PrivacyGuard().detect_motion, churn_frames, reuse)
+        if churn:
+            print(f"{label:<24} {churn['alloc_kb_per_frame']:8.0f} KB allocated/frame, "
+                  f"{churn['gc_collections']} GC collections")
+    if prefilter:
+        engine = guard.motion_engine
+        print(f"Prefilter:         full pipeline on {engine.full_runs} of {stats['frames']} frames "
+              f"({engine.full_runs / stats['frames'] * 100:.1f}%)")
+    if reduced or prefilter:
+        # Reference: full resolution, whole frame, MOG2 on every frame
+        reference = PrivacyGuard()
+        reference.config.set('processing_resolution', None, save=False)
+        reference.config.set('detection_roi', None, save=False)
+        reference.config.set('motion_prefilter', False, save=False)
+        reference.reset_motion_engine()
+        reference_result = replay(spec, reference.detect_motion, frames)
+        reference_stats = summarize(reference_result)
+        print_summary("reference (full resolution, no prefilter)", reference_stats)
+        print(f"Speedup vs reference: {stats['fps'] / reference_stats['fps']:.1f}x")
+        stats['comparison'] = compare_decisions(result['decisions'], reference_result['decisions'])
+        print_comparison("Decisions vs reference", stats['comparison'])
+    return stats
+
+
+def contour_loop_area(mask, min_area):
+    """The per-contour Python loop detect_motion used before connected components"""
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    motion_area = 0
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area > min_area:
+            motion_area += area
+    return motion_area
+
+
+def make_blob_mask(blobs, width=640, height=480, seed=0):
+    """Foreground mask with one large blob and `blobs` tiny noise specks"""
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((height, width), np.uint8)
+    cv2.rectangle(mask, (200, 120), (320, 400), 255, -1)
+    xs = rng.integers(0, width - 3, blobs)
+    ys = rng.integers(0, height - 3, blobs)
+    for x, y in zip(xs, ys):
+        mask[y:y + 2, x:x + 2] = 255
+    return mask
+
+
+def run_blob_benchmark(repeats=200):
+    """Micro-benchmark blob measurement cost against the number of blobs in the mask"""
+    from motion_engine import MotionEngine
+
+    engine = MotionEngine()
+    engine.setup((480, 640, 3))
+    print("⏱️  Blob measurement micro-benchmark (640x480 mask, one real blob + noise specks)")
+    print("-" * 70)
+    print(f"{'blobs':>6}  {'contour loop p50/p99 ms':>24}  {'components p50/p99 ms':>22}  area diff")
+    for blobs in (0, 10, 100, 500, 1000, 3000):
+        mask = make_blob_mask(blobs)
+        timings = {'loop': [], 'components': []}
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            loop_area = contour_loop_area(mask, 500)
+            t1 = time.perf_counter()
+            area, _ = engine.measure_blobs(mask, 500)
+            t2 = time.perf_counter()
+            timings['loop'].append((t1 - t0) * 1000)
+            timings['components'].append((t2 - t1) * 1000)
+        loop_ms = np.percentile(timings['loop'], [50, 99])
+        comp_ms = np.percentile(timings['components'], [50, 99])
+        print(f"{blobs:>6}  {loop_ms[0]:>11.3f} / {loop_ms[1]:<10.3f}  {comp_ms[0]:>10.3f} / {comp_ms[1]:<9.3f}"
+              f"  {(area - loop_area) / max(loop_area, 1) * 100:+.1f}%")
+
+
+def run_multi_benchmark(max_sources=4, frames=300):
+    """Throughput of 1..max_sources synthetic sources detected concurrently, one thread each"""
+    import threading
+    from config import Config
+    from motion_engine import MotionEngine
+
+    config = Config()
+    print(f"⏱️  Concurrent detection scaling ({frames} synthetic frames per source, "
+          f"{psutil.cpu_count()} CPUs, OpenCV threads {cv2.getNumThreads()})")
+    print("-" * 70)
+    print(f"{'sources':>7}  {'total FPS':>10}  {'per source':>10}  {'speedup':>8}  {'efficiency':>10}  {'CPU':>6}")
+    baseline = None
+    for count in range(1, max_sources + 1):
+        sources = [open_bench_source(f"synthetic:{seed}", frames) for seed in range(count)]
+        engines = [MotionEngine.from_config(config) for _ in range(count)]
+
+        def work(source, engine):
+            while True:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                engine.process(frame)
+
+        threads = [threading.Thread(target=work, args=pair) for pair in zip(sources, engines)]
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        cpu = (time.process_time() - cpu_start) / elapsed * 100
+        fps = count * frames / elapsed
+        baseline = baseline or fps
+        print(f"{count:>7}  {fps:>10.1f}  {fps / count:>10.1f}  {fps / baseline:>7.2f}x  "
+              f"{fps / baseline / count * 100:>9.0f}%  {cpu:>5.0f}%")
+
+
+def event_onsets(decisions):
+    """Frame indices where motion episodes start"""
+    previous = np.concatenate(([False], decisions[:-1]))
+    return np.flatnonzero(decisions & ~previous)
+
+
+def replay_duty_cycled(source, guard, fps, duty_cycle):
+    """Replay on a virtual clock at `fps`, processing only the frames the duty cycle asks for.
+
+    Returns per-frame decisions (unprocessed frames are False), the number of
+    processed frames and the detection thread CPU seconds.
+    """
+    decisions = []
+    processed = 0
+    cpu = 0.0
+    next_time = 0.0
+    index = 0
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        now = index / fps
+        index += 1
+        if now + 1e-9 < next_time:
+            decisions.append(False)
+            continue
+        t0 = time.thread_time()
+        motion = guard.detect_motion(frame)
+        cpu += time.thread_time() - t0
+        processed += 1
+        decisions.append(motion)
+        duty_cycle.update(now, motion or guard.motion_engine.activity)
+        next_time = now + duty_cycle.wait_time(now)
+    source.release()
+    return np.array(decisions, dtype=bool), processed, cpu
+
+
+def run_duty_benchmark(spec=None, frames=None, idle_after=5.0):
+    """Compare always-on processing with adaptive FPS on a mostly quiet replay.
+
+    The default scene is synthetic with a 2 s walk-through every 20 s. CPU time
+    of the detection thread stands in for battery use, which cannot be measured
+    on a replay.
+    """
+    from duty_cycle import DutyCycle
+    from privacy_guard import PrivacyGuard
+
+    fps = 30.0
+    frames = frames or 1800
+
+    def open_scene():
+        if spec is None:
+            source = SyntheticSource(frames=frames, motion_period=600, motion_length=60)
+            return source if source.open() else None
+        return open_bench_source(spec, frames)
+
+    probe = PrivacyGuard()
+    idle_fps = probe.config.get('idle_fps')
+    print(f"⏱️  Adaptive FPS replay: {spec or 'quiet synthetic scene'}, {frames} frames at {fps:g} FPS, "
+          f"idle after {idle_after:g}s at {idle_fps:g} FPS")
+    results = {}
+    for label, enabled in (("always on", False), ("adaptive", True)):
+        guard = PrivacyGuard()
+        source = open_scene()
+        if source is None:
+            print(f"❌ Cannot read frames from {spec}")
+            return None
+        duty_cycle = DutyCycle(idle_after, idle_fps, enabled)
+        results[label] = replay_duty_cycled(source, guard, fps, duty_cycle) + (duty_cycle,)
+    full_decisions, full_processed, full_cpu, _ = results["always on"]
+    decisions, processed, cpu, duty_cycle = results["adaptive"]
+    print("-" * 60)
+    for label, (_, count, seconds, _) in results.items():
+        print(f"{label:<10} processed {count:>5} frames, detection CPU {seconds:.2f}s")
+    print(f"CPU saved:         {(1 - cpu / max(full_cpu, 1e-9)) * 100:.0f}% "
+          f"(processed {processed / max(full_processed, 1) * 100:.0f}% of frames)")
+    # Detection delay per reference motion episode
+    delays = []
+    missed = 0
+    for onset in event_onsets(full_decisions):
+        end = onset
+        while end < len(full_decisions) and full_decisions[end]:
+            end += 1
+        hits = np.flatnonzero(decisions[onset:end])
+        if len(hits):
+            delays.append(hits[0] / fps)
+        else:
+            missed += 1
+    if delays:
+        print(f"Added detection latency: mean {np.mean(delays) * 1000:.0f} ms, "
+              f"max {max(delays) * 1000:.0f} ms over {len(delays)} episodes "
+              f"(bound {duty_cycle.worst_case_latency(fps) * 1000:.0f} ms)")
+    print(f"Missed episodes:   {missed}")
+    print(f"Wake-ups:          {duty_cycle.wakeups}")
+    return {'cpu_saved': 1 - cpu / max(full_cpu, 1e-9), 'delays': delays, 'missed': missed}
+
+
+def run_warm_start_benchmark(frames=None):
+    """Startup behaviour of a fresh, bootstrapped and restored background model.
+
+    Uses the quiet opening of the synthetic scene (no motion before the first
+    walk-through), so every motion decision there is a false positive.
+    """
+    from config import Config
+    from motion_engine import MotionEngine
+
+    config = Config()
+    fps = 30.0
+    probe = SyntheticSource()
+    quiet = frames or probe.motion_period - probe.motion_length
+    sensitivity = config.get('motion_sensitivity')
+
+    def run(engine, seed=0):
+        source = SyntheticSource(frames=quiet, seed=seed)
+        source.open()
+        flagged = []
+        ready_at = None
+        index = 0
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            flagged.append(engine.process(frame).area > sensitivity)
+            if ready_at is None and engine.ready:
+                ready_at = index
+            index += 1
+        source.release()
+        return np.array(flagged, dtype=bool), ready_at
+
+    # Background learned over a full earlier run of the same scene
+    trainer = MotionEngine.from_config(config)
+    run(trainer)
+    saved = trainer.background_image()
+
+    print(f"⏱️  Warm start: first {quiet} (quiet) frames of the synthetic scene at {fps:g} FPS")
+    print("-" * 70)
+    print(f"{'model':<28}{'false positives':>16}{'first reliable decision':>26}")
+    cases = (("fresh (no bootstrap, old)", 0, None),
+             (f"fresh + bootstrap {config.get('bootstrap_frames')}", config.get('bootstrap_frames'), None),
+             ("restored background", config.get('bootstrap_frames'), saved))
+    results = {}
+    for label, bootstrap, background in cases:
+        engine = MotionEngine.from_config(config)
+        engine.bootstrap_frames = engine.bootstrap_remaining = bootstrap
+        if background is not None:
+            engine.warm_start(background)
+        flagged, ready_at = run(engine)
+        positives = np.flatnonzero(flagged)
+        # Reliable from the frame after the last false positive, and not before the model is ready
+        reliable = max(ready_at or 0, positives[-1] + 1 if len(positives) else 0)
+        results[label] = (len(positives), reliable / fps)
+        print(f"{label:<28}{len(positives):>16}{reliable / fps * 1000:>22.0f} ms")
+    return results
+
+
+def synthetic_truth(spec, count):
+    """Per-frame ground truth for a synthetic spec, None for recorded footage"""
+    if spec != "synthetic" and not str(spec).startswith("synthetic:"):
+        return None
+    scene = SyntheticSource()
+    return np.array([scene.is_motion_frame(position) for position in range(count)], dtype=bool)
+
+
+def run_detector_benchmark(specs=("synthetic",), frames=None):
+    """Replay the same clips through detect_motion with every detector backend.
+
+    Every backend, like the MOG2-with-shadows reference, processes every frame
+    of the whole frame at full resolution (prefilter, ROI and downscaling off),
+    so only the detector differs. For the synthetic scene the true motion frames
+    are compared as well.
+    """
+    from detectors import DETECTORS
+    from privacy_guard import PrivacyGuard
+
+    def configured_guard(detector):
+        # Every run differs only in the backend: full resolution, whole frame, no prefilter
+        guard = PrivacyGuard()
+        for key, value in (('detector', detector), ('detect_shadows', True), ('processing_resolution', None),
+                           ('detection_roi', None), ('motion_prefilter', False)):
+            guard.config.set(key, value, save=False)
+        guard.reset_motion_engine()
+        return guard
+
+    for spec in specs:
+        print(f"\n⏱️  Detector comparison on {spec}")
+        reference = configured_guard('mog2')
+        reference_result = replay(spec, reference.detect_motion, frames)
+        if reference_result is None:
+            print(f"❌ Cannot read frames from {spec}")
+            continue
+        truth = synthetic_truth(spec, reference_result['frames'])
+        print("-" * 96)
+        print(f"{'detector':<17}{'FPS':>8}{'p50 ms':>8}{'p99 ms':>8}{'vs reference':>14}{'missed':>8}"
+              + (f"{'vs truth':>10}{'missed':>8}" if truth is not None else ""))
+        for name in DETECTORS:
+            guard = configured_guard(name)
+            result = replay(spec, guard.detect_motion, frames)
+            stats = summarize(result)
+            comparison = compare_decisions(result['decisions'], reference_result['decisions'])
+            line = (f"{name:<17}{stats['fps']:>8.1f}{stats['p50_ms']:>8.2f}{stats['p99_ms']:>8.2f}"
+                    f"{comparison['agreement'] * 100:>13.1f}%"
+                    f"{comparison['missed_events']:>4}/{comparison['reference_events']:<3}")
+            if truth is not None:
+                accuracy = compare_decisions(result['decisions'], truth)
+                line += (f"{accuracy['agreement'] * 100:>9.1f}%"
+                         f"{accuracy['missed_events']:>4}/{accuracy['reference_events']:<3}")
+            print(line)
+
+
+def run_tile_benchmark(spec=None, frames=None, size=(1920, 1080), tiles=None):
+    """Tiled detection at full 1080p/4K resolution with 1..N worker threads.
+
+    Every run replays the same frames (resized to `size`) through a fresh engine
+    with prefilter and downscaling off, and each frame's area and boxes are
+    compared against the untiled run.
+    """
+    from config import Config
+    from motion_engine import MotionEngine
+
+    config = Config()
+    tiles = tiles or config.get('detection_tiles') or 8
+    spec = spec or "synthetic"
+    cpus = psutil.cpu_count() or 1
+    workers = sorted({count for count in (1, 2, 4, 8, 16, 32) if count < cpus} | {cpus})
+
+    def open_scene():
+        if spec == "synthetic":
+            source = SyntheticSource(width=size[0], height=size[1], frames=frames or 300)
+            return source if source.open() else None
+        return open_bench_source(spec, frames)
+
+    def run(engine):
+        source = open_scene()
+        if source is None:
+            return None
+        latencies, results = [], []
+        while frames is None or len(results) < frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            if (frame.shape[1], frame.shape[0]) != size:
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+            start = time.perf_counter()
+            result = engine.process(frame)
+            latencies.append(time.perf_counter() - start)
+            results.append((result.area, result.boxes))
+        source.release()
+        engine.close()
+        return np.array(latencies), results
+
+    def engine(tile_count=0, pool=0):
+        return MotionEngine(min_area=config.get('min_contour_area'), detect_shadows=config.get('detect_shadows'),
+                            detector=config.get('detector'), tiles=tile_count, tile_workers=pool)
+
+    print(f"⏱️  Tiled detection on {spec} at {size[0]}x{size[1]}, {tiles} strips, detector "
+          f"{config.get('detector')} ({cpus} CPUs, OpenCV threads {cv2.getNumThreads()})")
+    baseline = run(engine())
+    if baseline is None:
+        print(f"❌ Cannot read frames from {spec}")
+        return
+    reference_latencies, reference = baseline
+    reference_fps = len(reference) / reference_latencies.sum()
+    print("-" * 72)
+    print(f"{'mode':<16}{'FPS':>8}{'p50 ms':>9}{'p99 ms':>9}{'speedup':>9}{'efficiency':>11}{'mismatch':>10}")
+    print(f"{'single-thread':<16}{reference_fps:>8.1f}{np.percentile(reference_latencies, 50) * 1000:>9.1f}"
+          f"{np.percentile(reference_latencies, 99) * 1000:>9.1f}{1.0:>8.2f}x{'':>11}{'-':>10}")
+    for count in workers:
+        latencies, results = run(engine(tiles, count))
+        fps = len(results) / latencies.sum()
+        mismatched = sum(1 for ours, theirs in zip(results, reference) if ours != theirs)
+        print(f"{f'{count} thread(s)':<16}{fps:>8.1f}{np.percentile(latencies, 50) * 1000:>9.1f}"
+              f"{np.percentile(latencies, 99) * 1000:>9.1f}{fps / reference_fps:>8.2f}x"
+              f"{fps / reference_fps / count * 100:>10.0f}%{mismatched:>6}/{len(results):<3}")
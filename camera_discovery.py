@@ -0,0 +1,137 @@
+"""
+Camera discovery for Privacy Guard System
+
+Camera indices are probed concurrently, each with its own deadline, so an index
+whose driver hangs costs at most `timeout` seconds in total instead of per index.
+Results are cached on disk together with a fingerprint of the attached video
+devices; the cache is reused until the devices change or it gets too old.
+"""
+
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = "config/camera_cache.json"
+# Windows device interface class of video capture devices (KSCATEGORY_VIDEO_CAMERA)
+WINDOWS_CAMERA_CLASS = r"SYSTEM\CurrentControlSet\Control\DeviceClasses\{e5323777-f976-4f5b-9b55-b94699c46e44}"
+
+
+def device_fingerprint():
+    """Cheap identifier of the attached video devices, None if the platform has none"""
+    if sys.platform.startswith("linux"):
+        nodes = sorted(glob.glob("/dev/video*"))
+        # ctime changes when a node is recreated, i.e. the device was replugged
+        return ";".join(f"{node}:{int(os.stat(node).st_ctime)}" for node in nodes)
+    if sys.platform == "win32":
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, WINDOWS_CAMERA_CLASS) as key:
+                count = winreg.QueryInfoKey(key)[0]
+                return ";".join(sorted(winreg.EnumKey(key, i) for i in range(count)))
+        except OSError:
+            return None
+    return None
+
+
+def probe_camera(index):
+    """Open one camera index and describe it, None if it is unavailable"""
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            return None
+        ret, _ = cap.read()
+        if not ret:
+            return None
+        return {
+            'index': index,
+            'name': f'Camera {index}',
+            'resolution': (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                           int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))),
+            'fps': round(cap.get(cv2.CAP_PROP_FPS), 1),
+        }
+    finally:
+        cap.release()
+
+
+def probe_cameras(indices, timeout=3.0):
+    """Probe indices in parallel; indices still hanging after `timeout` are reported missing"""
+    results = {}
+
+    def probe(index):
+        try:
+            results[index] = probe_camera(index)
+        except Exception as e:
+            logger.warning(f"Camera {index} probe failed: {e}")
+
+    threads = [threading.Thread(target=probe, args=(index,), name=f"CameraProbe{index}", daemon=True)
+               for index in indices]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for index, thread in zip(indices, threads):
+        thread.join(max(0.0, deadline - time.monotonic()))
+        if thread.is_alive():
+            # A hung driver call cannot be cancelled; the daemon thread is abandoned
+            logger.warning(f"Camera {index} probe timed out after {timeout}s")
+    return [results[index] for index in indices if results.get(index)]
+
+
+def load_cache(cache_file):
+    try:
+        with open(cache_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cache(cache_file, cache):
+    try:
+        os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        logger.warning(f"Cannot save camera cache: {e}")
+
+
+def discover_cameras(max_index=5, timeout=3.0, cache_file=CACHE_FILE, max_age=86400, refresh=False,
+                     skip=()):
+    """Available cameras as dicts with index, name, resolution and fps.
+
+    Served from the cache when it was built for the same devices and index range
+    within `max_age` seconds, unless `refresh` is set. Indices in `skip` (e.g.
+    the camera currently in use) are not opened; cached entries for them are kept,
+    and a cache missing them is only reused by calls that skip them as well.
+    """
+    # Only integer camera indices can be skipped (not e.g. a video file path)
+    skip = {index for index in skip if isinstance(index, int)}
+    fingerprint = device_fingerprint()
+    cache = None if refresh else load_cache(cache_file)
+    # Indices skipped without a cached entry are unknown; only callers that skip them too can reuse the cache
+    if cache and cache.get('fingerprint') == fingerprint and cache.get('max_index') == max_index \
+            and time.time() - cache.get('probed_at', 0) < max_age \
+            and all(index in skip for index in cache.get('unprobed', [])):
+        return [dict(camera, resolution=tuple(camera['resolution'])) for camera in cache['cameras']]
+    started = time.perf_counter()
+    cameras = probe_cameras([i for i in range(max_index) if i not in skip], timeout)
+    if skip and cache:
+        cameras += [dict(camera, resolution=tuple(camera['resolution']))
+                    for camera in cache.get('cameras', []) if camera['index'] in skip]
+        cameras.sort(key=lambda camera: camera['index'])
+    found = {camera['index'] for camera in cameras}
+    logger.info(f"Camera discovery found {len(cameras)} camera(s) in {time.perf_counter() - started:.1f}s")
+    save_cache(cache_file, {
+        'fingerprint': fingerprint,
+        'max_index': max_index,
+        'probed_at': time.time(),
+        'cameras': cameras,
+        'unprobed': sorted(index for index in skip if index < max_index and index not in found),
+    })
+    return cameras
@@ -0,0 +1,159 @@
+"""
+Threaded frame capture for Privacy Guard System
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+CapturedFrame = namedtuple('CapturedFrame', ['frame', 'timestamp', 'sequence', 'dropped'])
+
+
+class FrameRingBuffer:
+    """Small preallocated ring of frame slots where the reader always gets the newest frame.
+
+    A single capture thread writes into the slots and a single detection thread
+    reads from them. The slot the reader is holding and the newest published slot
+    are never handed out for writing, so frames are never copied and never torn.
+    """
+
+    def __init__(self, size=3, shape=None, dtype=np.uint8):
+        if size < 3:
+            raise ValueError("Ring buffer needs at least 3 slots")
+        self.size = size
+        self.slots = [np.empty(shape, dtype) if shape else None for _ in range(size)]
+        self.timestamps = [0.0] * size
+        self.cond = threading.Condition()
+        self.write_index = 0
+        self.latest_index = None
+        self.read_index = None
+        self.sequence = 0
+        self.last_read_sequence = 0
+        self.dropped_total = 0
+        self.closed = False
+
+    def acquire_write_slot(self):
+        """Return (index, buffer) of a slot the capture thread may overwrite"""
+        with self.cond:
+            for step in range(1, self.size + 1):
+                index = (self.write_index + step) % self.size
+                if index != self.read_index and index != self.latest_index:
+                    self.write_index = index
+                    return index, self.slots[index]
+        raise RuntimeError("No free ring buffer slot")
+
+    def publish(self, index, frame, timestamp):
+        """Mark a written slot as the newest frame"""
+        with self.cond:
+            # Adopt the array if read() had to allocate (first frame or resolution change)
+            self.slots[index] = frame
+            self.timestamps[index] = timestamp
+            self.latest_index = index
+            self.sequence += 1
+            self.cond.notify()
+
+    def get_latest(self, timeout=None):
+        """Wait for a frame newer than the last one read and claim it.
+
+        Returns a CapturedFrame or None on timeout / close. The claimed frame stays
+        valid until the next call to get_latest.
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.closed or self.sequence > self.last_read_sequence,
+                                      timeout):
+                return None
+            if self.sequence <= self.last_read_sequence:
+                return None
+            dropped = self.sequence - self.last_read_sequence - 1
+            self.dropped_total += dropped
+            self.last_read_sequence = self.sequence
+            self.read_index = self.latest_index
+            self.latest_index = None
+            return CapturedFrame(self.slots[self.read_index], self.timestamps[self.read_index],
+                                 self.sequence, dropped)
+
+    def wait_for_frame(self, timeout=None):
+        """Wait until a frame has been published without claiming it"""
+        with self.cond:
+            return self.cond.wait_for(lambda: self.latest_index is not None or self.closed, timeout) \
+                and self.latest_index is not None
+
+    def discard_backlog(self):
+        """Treat everything published so far, except the newest frame, as already seen"""
+        with self.cond:
+            self.last_read_sequence = max(self.last_read_sequence, self.sequence - 1)
+
+    def close(self):
+        """Wake up any waiting reader"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class CaptureThread(threading.Thread):
+    """Reads frames from a camera as fast as it delivers them into a FrameRingBuffer"""
+
+    def __init__(self, camera, ring_buffer):
+        super().__init__(name="PrivacyGuardCapture", daemon=True)
+        self.camera = camera
+        self.ring_buffer = ring_buffer
+        self.running = False
+        self.failed = False
+        self.frames_captured = 0
+        # CPU seconds used by this thread so far
+        self.cpu_time = 0.0
+
+    def run(self):
+        self.running = True
+        while self.running:
+            index, buffer = self.ring_buffer.acquire_write_slot()
+            ret, frame = self.camera.read(buffer)
+            if not ret or frame is None:
+                if self.running:
+                    self.failed = True
+                break
+            self.frames_captured += 1
+            self.ring_buffer.publish(index, frame, time.perf_counter())
+            self.cpu_time = time.thread_time()
+        self.running = False
+        self.ring_buffer.close()
+
+    def stop(self, timeout=2.0):
+        """Stop capturing and wait for the thread to exit"""
+        self.running = False
+        if self.is_alive():
+            self.join(timeout)
+
+
+class CaptureStats:
+    """Rolling capture-to-decision latency and dropped frame counters"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.dropped = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.window_start = time.perf_counter()
+
+    def record(self, latency, dropped):
+        self.frames += 1
+        self.dropped += dropped
+        self.latency_total += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+
+    def elapsed(self):
+        return time.perf_counter() - self.window_start
+
+    def summary(self):
+        """One-line summary of the current window"""
+        elapsed = max(self.elapsed(), 1e-6)
+        avg_ms = self.latency_total / self.frames * 1000 if self.frames else 0.0
+        return (f"processed {self.frames} frames ({self.frames / elapsed:.1f} FPS), "
+                f"dropped {self.dropped}, capture-to-decision latency "
+                f"avg {avg_ms:.1f} ms / max {self.latency_max * 1000:.1f} ms")
@@ -9,12 +9,71 @@ class Config:
         self.config_file = "config/settings.json"
         self.default_settings = {
             "camera_index": 1,  # 0 = laptop, 1+ = phone/external
+            "frame_source": "camera",  # camera, synthetic, video file path or image folder
             "motion_sensitivity": 1500,
             "detection_delay": 5,  # seconds between detections
             "auto_close_apps": True,
+            "action_backend": "auto",  # windows, fake (log only) or auto (windows on Windows)
+            "close_timeout": 2.0,  # seconds to wait for force-closed apps before killing them
+            "process_index_interval": 2,  # seconds between background process list refreshes
+            "extra_sources": [],  # more sources watched at once, e.g. [{"source": "camera:0", "sensitivity": 1500, "weight": 1.0}]
+            "fusion_rule": "any",  # any, k_of_n or weighted: how source motion votes become a breach
+            "fusion_k": 2,  # k_of_n: sources that must see motion
+            "fusion_threshold": 1.0,  # weighted: summed weight of sources seeing motion needed
+            "fusion_window": 0.5,  # seconds a source's motion keeps counting as a vote
+            "primary_weight": 1.0,  # weight of the primary source in weighted fusion
             "show_camera_feed": True,
+            "headless": False,  # never open a window or poll the keyboard (no HighGUI at all)
+            "preview_fps": 5,  # preview window / key polling rate, independent of detection
             "enable_notifications": True,
             "log_level": "INFO",
+            "log_max_mb": 10,  # rotate logs/privacy_guard.log at this size (and daily)
+            "log_backup_count": 5,  # size-rotated log files kept per day (days are kept as dated files)
+            "log_retention_days": 14,  # delete older log files
+            "log_rate_limit_seconds": 10,  # repeats of one log message are collapsed within this window
+            "camera_warmup_frames": 15,  # frames read into the background model before a switched camera goes live
+            "camera_warmup_timeout": 10,  # seconds a switched camera may spend warming up its background model
+            "adaptive_fps": True,  # process fewer frames while the scene is quiet
+            "idle_after_seconds": 30,  # quiet time before dropping to idle_fps
+            "idle_fps": 5,  # processing rate while idle; any motion signal restores the full rate
+            "capture_buffer_size": 3,  # frame slots between capture and detection
+            "stats_log_interval": 60,  # seconds between capture latency/drop log lines
+            "min_contour_area": 500,  # ignore moving blobs smaller than this (pixels)
+            "detector": "mog2",  # mog2, mog2_noshadows, knn, running_average or frame_diff
+            "detect_shadows": True,  # shadow detection for the mog2 and knn detectors
+            "processing_resolution": None,  # e.g. [320, 240]; None = detect at capture size
+            "detection_tiles": 0,  # split frames into this many strips detected in parallel (0 = off)
+            "detection_threads": 0,  # worker threads for tiled detection (0 = one per CPU)
+            "detection_roi": None,  # [x, y, width, height] in frame pixels; None = whole frame
+            "bootstrap_frames": 30,  # a fresh background model reports no motion for this many frames
+            "background_dir": "models",  # learned backgrounds saved here for a warm start
+            "background_max_age_hours": 12,  # older saved backgrounds are ignored
+            "background_save_interval": 600,  # seconds between background saves (0 = only at exit)
+            "motion_prefilter": True,  # skip MOG2 on frames a cheap thumbnail diff finds unchanged
+            "prefilter_threshold": 15,  # thumbnail pixel intensity change that counts as motion
+            "prefilter_refresh_frames": 10,  # feed the background model at least this often
+            "instrumentation": False,  # per-stage pipeline timing
+            "instrumentation_sample_every": 1,  # time 1 of every N frames
+            "instrumentation_dump_interval": 300,  # seconds between timing dumps (0 = off)
+            "cprofile_seconds": 10,  # length of a 'P' cProfile capture
+            "control_channel": True,  # accept runtime commands (sensitivity, camera, test, feed)
+            "control_address": None,  # socket path / pipe name; None = ./privacy_guard.sock (a named pipe on Windows)
+            "control_authkey": "",  # shared secret required from control clients ("" = none)
+            "control_stdin": True,  # also read commands typed in the terminal
+            "metrics_port": 0,  # serve Prometheus metrics on this local port (0 = off)
+            "metrics_host": "127.0.0.1",  # interface for the metrics endpoint
+            "snapshot_dir": "snapshots",
+            "snapshot_format": "jpg",  # jpg, png or webp
+            "snapshot_quality": 90,  # JPEG/WebP quality 0-100
+            "snapshot_scale": 1.0,  # downscale factor applied before encoding
+            "snapshot_queue_size": 8,  # pending snapshots kept; oldest dropped when full
+            "save_breach_clips": True,  # also save a short clip around each breach
+            "clip_pre_seconds": 3,  # seconds of history kept before a breach
+            "clip_post_seconds": 2,  # seconds recorded after a breach
+            "clip_fps": 10,  # frames per second kept for clips
+            "clip_scale": 0.5,  # clip frames are downscaled by this factor
+            "clip_quality": 70,  # JPEG quality of buffered clip frames
+            "clip_max_mb": 8,  # hard cap on buffered history
             "protected_processes": [
                 "explorer.exe", "winlogon.exe", "csrss.exe", 
                 "wininit.exe", "services.exe", "lsass.exe", 
@@ -33,6 +92,8 @@ class Config:
             ]
         }
         self.settings = self.load_settings()
+        # Values set for this run only (command line flags, benchmarks); never saved
+        self.overrides = {}
     
     def load_settings(self):
         """Load settings from JSON file or create default"""
@@ -57,9 +118,15 @@ class Config:
     
     def get(self, key):
         """Get configuration value"""
+        if key in self.overrides:
+            return self.overrides[key]
         return self.settings.get(key, self.default_settings.get(key))
     
-    def set(self, key, value):
-        """Set configuration value and save"""
+    def set(self, key, value, save=True):
+        """Set configuration value and save (save=False keeps it for this run only)"""
+        if not save:
+            self.overrides[key] = value
+            return
+        self.overrides.pop(key, None)
         self.settings[key] = value
         self.save_settings()
@@ -0,0 +1,157 @@
+"""
+Runtime control channel for Privacy Guard System
+
+Commands arrive over a local socket / named pipe (multiprocessing.connection)
+or as lines typed on stdin. Reader threads only queue them; the monitoring loop
+applies queued commands between frames, so nothing ever blocks detection.
+
+Commands and replies travel as UTF-8 text (send_bytes/recv_bytes), never as
+pickles, so a client cannot make the guard unpickle arbitrary objects.
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+logger = logging.getLogger(__name__)
+
+REPLY_TIMEOUT = 5.0
+# Longest command or reply accepted, in bytes
+MAX_MESSAGE_BYTES = 4096
+
+
+def default_address():
+    """Named pipe on Windows, Unix socket in the working directory elsewhere"""
+    if sys.platform == "win32":
+        return r"\\.\pipe\privacy_guard"
+    return os.path.abspath("privacy_guard.sock")
+
+
+class ControlCommand:
+    """One queued command; the sender waits on `done` for the reply"""
+
+    __slots__ = ('text', 'source', 'received_at', 'done', 'reply')
+
+    def __init__(self, text, source):
+        self.text = text.strip()
+        self.source = source
+        self.received_at = time.perf_counter()
+        self.done = threading.Event()
+        self.reply = None
+
+    def complete(self, reply):
+        self.reply = reply
+        self.done.set()
+
+
+class ControlChannel:
+    """Queues commands from a local listener and (optionally) stdin.
+
+    poll() is called by the monitoring loop and never blocks.
+    """
+
+    def __init__(self, address=None, authkey=None, stdin=True):
+        self.address = address or default_address()
+        self.authkey = authkey.encode() if isinstance(authkey, str) and authkey else None
+        self.stdin = stdin
+        self.commands = queue.SimpleQueue()
+        self.listener = None
+        self.running = False
+
+    def start(self):
+        self.running = True
+        if self.address:
+            try:
+                if not self.address.startswith("\\\\") and os.path.exists(self.address):
+                    os.remove(self.address)  # stale socket from an unclean exit
+                self.listener = Listener(self.address, authkey=self.authkey)
+                if not self.address.startswith("\\\\"):
+                    os.chmod(self.address, 0o600)  # owner only
+            except OSError as e:
+                logger.error(f"Cannot open control channel at {self.address}: {e}")
+                self.listener = None
+            else:
+                threading.Thread(target=self.accept_loop, name="PrivacyGuardControl", daemon=True).start()
+                logger.info(f"Control channel listening on {self.address}")
+        if self.stdin and sys.stdin is not None and sys.stdin.isatty():
+            threading.Thread(target=self.stdin_loop, name="PrivacyGuardStdin", daemon=True).start()
+
+    def accept_loop(self):
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except Exception as e:
+                if self.running:
+                    logger.warning(f"Control connection rejected: {e}")
+                    continue
+                return
+            if not self.running:
+                conn.close()
+                return
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        """Answer commands from one client until it disconnects"""
+        with conn:
+            while self.running:
+                try:
+                    text = conn.recv_bytes(MAX_MESSAGE_BYTES).decode('utf-8', errors='replace')
+                except (EOFError, OSError):
+                    return
+                command = ControlCommand(text, "socket")
+                self.commands.put(command)
+                if not command.done.wait(REPLY_TIMEOUT):
+                    command.reply = "error: monitoring loop did not answer"
+                try:
+                    conn.send_bytes(str(command.reply).encode('utf-8')[:MAX_MESSAGE_BYTES])
+                except OSError:
+                    return
+
+    def stdin_loop(self):
+        for line in sys.stdin:
+            if not self.running:
+                return
+            if line.strip():
+                command = ControlCommand(line, "stdin")
+                self.commands.put(command)
+                if command.done.wait(REPLY_TIMEOUT):
+                    print(command.reply)
+
+    def poll(self):
+        """Next queued command or None"""
+        try:
+            return self.commands.get_nowait()
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        self.running = False
+        if self.listener is not None:
+            try:
+                # Wake accept() so the listener thread can exit
+                Client(self.address, authkey=self.authkey).close()
+            except Exception:
+                pass
+            self.listener.close()
+            self.listener = None
+        # Release anyone still waiting for a reply
+        while True:
+            command = self.poll()
+            if command is None:
+                break
+            command.complete("error: Privacy Guard is stopping")
+
+
+def send_command(text, address=None, authkey=None, timeout=REPLY_TIMEOUT):
+    """Send one command to a running Privacy Guard and return its reply"""
+    address = address or default_address()
+    key = authkey.encode() if isinstance(authkey, str) and authkey else None
+    with Client(address, authkey=key) as conn:
+        conn.send_bytes(text.encode('utf-8'))
+        if not conn.poll(timeout):
+            raise TimeoutError("no reply from Privacy Guard")
+        return conn.recv_bytes(MAX_MESSAGE_BYTES).decode('utf-8', errors='replace')
@@ -0,0 +1,95 @@
+"""
+Background model backends for the motion engine
+
+Every backend offers the subset of cv2.BackgroundSubtractor that MotionEngine
+uses: apply(image, fgmask, learningRate) returning a 0/255 foreground mask,
+getHistory() and getBackgroundImage(). Images are blurred 8-bit grayscale.
+"""
+
+import cv2
+import numpy as np
+
+# Intensity change that marks a pixel as foreground for the simple backends
+DIFF_THRESHOLD = 25
+
+
+class RunningAverageDetector:
+    """Exponential running average background (cv2.accumulateWeighted)"""
+
+    def __init__(self, alpha=0.02, threshold=DIFF_THRESHOLD):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.background = None
+        self.frames = 0
+        self.current = self.diff = None
+
+    def getHistory(self):
+        return int(round(1.0 / self.alpha))
+
+    def apply(self, image, fgmask=None, learningRate=-1):
+        if self.background is None or self.background.shape != image.shape:
+            self.background = image.astype(np.float32)
+            self.frames = 0
+        if learningRate < 0:
+            # Like MOG2: learn quickly at first, settle to alpha
+            learningRate = max(self.alpha, 1.0 / (self.frames + 1))
+        self.current = cv2.convertScaleAbs(self.background, dst=self.current)
+        self.diff = cv2.absdiff(image, self.current, dst=self.diff)
+        _, fgmask = cv2.threshold(self.diff, self.threshold, 255, cv2.THRESH_BINARY, dst=fgmask)
+        cv2.accumulateWeighted(image, self.background, learningRate)
+        self.frames += 1
+        return fgmask
+
+    def getBackgroundImage(self):
+        return cv2.convertScaleAbs(self.background) if self.background is not None else None
+
+
+class FrameDifferenceDetector:
+    """Difference against the previous frame; no background model at all"""
+
+    def __init__(self, threshold=DIFF_THRESHOLD):
+        self.threshold = threshold
+        self.previous = None
+        self.diff = None
+
+    def getHistory(self):
+        return 1
+
+    def apply(self, image, fgmask=None, learningRate=-1):
+        if self.previous is None or self.previous.shape != image.shape:
+            self.previous = image.copy()
+        self.diff = cv2.absdiff(image, self.previous, dst=self.diff)
+        _, fgmask = cv2.threshold(self.diff, self.threshold, 255, cv2.THRESH_BINARY, dst=fgmask)
+        np.copyto(self.previous, image)
+        return fgmask
+
+    def getBackgroundImage(self):
+        return self.previous.copy() if self.previous is not None else None
+
+
+DETECTORS = {
+    # name: (description, factory(detect_shadows))
+    'mog2': ("MOG2 (shadow detection per 'detect_shadows')",
+             lambda shadows: cv2.createBackgroundSubtractorMOG2(detectShadows=shadows)),
+    'mog2_noshadows': ("MOG2 without shadow detection",
+                       lambda shadows: cv2.createBackgroundSubtractorMOG2(detectShadows=False)),
+    'knn': ("KNN (shadow detection per 'detect_shadows')",
+            lambda shadows: cv2.createBackgroundSubtractorKNN(detectShadows=shadows)),
+    'running_average': ("running average background (accumulateWeighted)",
+                        lambda shadows: RunningAverageDetector()),
+    'frame_diff': ("previous-frame differencing",
+                   lambda shadows: FrameDifferenceDetector()),
+}
+
+# Backends whose pixels are modelled independently, so horizontal strips can each
+# get their own model with results identical to one whole-frame model. KNN draws
+# the samples it replaces from OpenCV's shared random generator, so it keeps one
+# model (and is not bit-for-bit reproducible between two instances anyway).
+SPLITTABLE = {'mog2', 'mog2_noshadows', 'running_average', 'frame_diff'}
+
+
+def create_detector(name="mog2", detect_shadows=True):
+    """Background model backend by name (see DETECTORS)"""
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown detector: {name} (choose from {', '.join(DETECTORS)})")
+    return DETECTORS[name][1](detect_shadows)
@@ -0,0 +1,65 @@
+"""
+Adaptive processing rate for Privacy Guard System
+
+After `idle_after` seconds without any motion signal the monitoring loop only
+processes `idle_fps` frames per second. The first frame whose cheap signal (the
+prefilter tripping or any foreground blob) rises switches straight back to the
+full rate. Capture keeps running at the camera rate, so the frame processed
+after an idle pause is always the newest one.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DutyCycle:
+    """Decides when the next frame should be processed"""
+
+    def __init__(self, idle_after=30.0, idle_fps=5.0, enabled=True):
+        self.idle_after = idle_after
+        self.idle_interval = 1.0 / max(0.1, idle_fps)
+        self.enabled = enabled
+        self.idle = False
+        self.last_activity = None
+        self.next_due = 0.0
+        # Statistics
+        self.idle_since = None
+        self.idle_seconds = 0.0
+        self.wakeups = 0
+
+    def wait_time(self, now):
+        """Seconds to wait before processing the next frame (0 at full rate)"""
+        if not self.idle:
+            return 0.0
+        return max(0.0, self.next_due - now)
+
+    def update(self, now, active):
+        """Report whether the frame processed at `now` showed any activity"""
+        if self.last_activity is None:
+            self.last_activity = now
+        if active:
+            self.last_activity = now
+            if self.idle:
+                self.idle = False
+                self.wakeups += 1
+                self.idle_seconds += now - self.idle_since
+                logger.info("Activity detected, back to full processing rate")
+        elif self.enabled and not self.idle and now - self.last_activity >= self.idle_after:
+            self.idle = True
+            self.idle_since = now
+            logger.info(f"No motion for {self.idle_after:g}s, processing at "
+                        f"{1.0 / self.idle_interval:g} FPS until activity")
+        if self.idle:
+            self.next_due = now + self.idle_interval
+
+    def worst_case_latency(self, full_fps=30.0):
+        """Extra detection delay motion can see while idle, in seconds"""
+        return max(0.0, self.idle_interval - 1.0 / full_fps) if self.enabled else 0.0
+
+    def total_idle(self, now):
+        return self.idle_seconds + (now - self.idle_since if self.idle else 0.0)
+
+    def summary(self, now, uptime):
+        return (f"idle {self.total_idle(now):.0f}s of {uptime:.0f}s, {self.wakeups} wake-ups, "
+                f"worst-case added detection latency {self.worst_case_latency() * 1000:.0f} ms")
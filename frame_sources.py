@@ -0,0 +1,294 @@
+"""
+Frame sources for Privacy Guard System
+
+Every source exposes the same small, VideoCapture-like interface so the monitoring
+loop, the camera test utility and the benchmarks can run against a live camera,
+recorded footage or generated frames without caring which one it is.
+"""
+
+import glob
+import os
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+class FrameSource:
+    """Base class for frame sources"""
+
+    # Live sources keep producing frames; finite ones (files, directories) run out
+    live = False
+
+    def __init__(self, name, paced=False):
+        self.name = name
+        # Paced sources sleep between frames to mimic a camera delivering at its FPS
+        self.paced = paced
+        self.next_time = None
+
+    def wait_for_next_frame(self, fps):
+        """Sleep until the next frame is due when pacing at `fps`"""
+        now = time.perf_counter()
+        if self.next_time is None or self.next_time < now - 1.0:
+            self.next_time = now
+        delay = self.next_time - now
+        if delay > 0:
+            time.sleep(delay)
+        self.next_time += 1.0 / (fps or 30)
+
+    def open(self):
+        """Open the source, returns True on success"""
+        return True
+
+    def is_opened(self):
+        return True
+
+    def read(self, frame=None):
+        """Read the next frame, writing into `frame` when possible. Returns (ret, frame)"""
+        raise NotImplementedError
+
+    def get(self, prop):
+        """Get a cv2.CAP_PROP_* value (0 when unsupported)"""
+        return 0
+
+    def set(self, prop, value):
+        """Set a cv2.CAP_PROP_* value (False when unsupported)"""
+        return False
+
+    def frame_size(self):
+        """Return (width, height) of delivered frames, or None if unknown"""
+        width = int(self.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width > 0 and height > 0:
+            return width, height
+        return None
+
+    def release(self):
+        pass
+
+    def __str__(self):
+        return self.name
+
+
+class CameraSource(FrameSource):
+    """Live camera opened with cv2.VideoCapture"""
+
+    live = True
+
+    def __init__(self, index):
+        super().__init__(f"camera {index}")
+        self.index = index
+        self.capture = None
+
+    def open(self):
+        self.capture = cv2.VideoCapture(self.index)
+        return self.capture.isOpened()
+
+    def is_opened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def read(self, frame=None):
+        return self.capture.read(frame)
+
+    def get(self, prop):
+        return self.capture.get(prop) if self.capture is not None else 0
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value) if self.capture is not None else False
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+
+
+class VideoFileSource(CameraSource):
+    """Recorded video file, optionally looped"""
+
+    live = False
+
+    def __init__(self, path, loop=False, paced=False):
+        super().__init__(path)
+        self.name = f"video {os.path.basename(path)}"
+        self.path = path
+        self.loop = loop
+        self.paced = paced
+
+    def open(self):
+        if not os.path.isfile(self.path):
+            return False
+        return super().open()
+
+    def read(self, frame=None):
+        if self.paced:
+            self.wait_for_next_frame(self.capture.get(cv2.CAP_PROP_FPS))
+        ret, frame = self.capture.read(frame)
+        if not ret and self.loop:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read(frame)
+        return ret, frame
+
+
+class ImageDirectorySource(FrameSource):
+    """Directory of still images played back in file name order"""
+
+    def __init__(self, path, loop=False, paced=False, fps=30):
+        super().__init__(f"images {path}", paced)
+        self.path = path
+        self.loop = loop
+        self.fps = fps
+        self.files = []
+        self.position = 0
+        self.size = None
+
+    def open(self):
+        if not os.path.isdir(self.path):
+            return False
+        self.files = sorted(f for f in glob.glob(os.path.join(self.path, '*'))
+                            if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.position = 0
+        return bool(self.files)
+
+    def is_opened(self):
+        return bool(self.files)
+
+    def read(self, frame=None):
+        if self.position >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self.position = 0
+        if self.paced:
+            self.wait_for_next_frame(self.fps)
+        image = cv2.imread(self.files[self.position])
+        self.position += 1
+        if image is None:
+            return False, None
+        self.size = (image.shape[1], image.shape[0])
+        if frame is not None and frame.shape == image.shape:
+            np.copyto(frame, image)
+            return True, frame
+        return True, image
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.files)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.position
+        if self.size is None and self.files:
+            image = cv2.imread(self.files[0])
+            if image is not None:
+                self.size = (image.shape[1], image.shape[0])
+        if self.size and prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.size[0]
+        if self.size and prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.size[1]
+        return 0
+
+    def release(self):
+        self.files = []
+
+
+class SyntheticSource(FrameSource):
+    """Deterministic generated scene: a noisy static room with a figure walking through it.
+
+    The same seed always produces the same frames, so runs on different machines
+    can be compared directly. `frames` limits the length (None = endless) and
+    `paced` sleeps between frames to mimic a camera running at `fps`.
+    """
+
+    def __init__(self, width=640, height=480, frames=None, seed=0, fps=30,
+                 paced=False, motion_period=150, motion_length=45):
+        super().__init__(f"synthetic seed={seed}", paced)
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self.seed = seed
+        self.fps = fps
+        self.motion_period = motion_period
+        self.motion_length = motion_length
+        self.position = 0
+        self.background = None
+        self.noisy_frames = None
+
+    def open(self):
+        rng = np.random.default_rng(self.seed)
+        # Smooth static "room" plus a small bank of precomputed sensor-noise frames
+        room = rng.integers(40, 200, (self.height // 16 + 1, self.width // 16 + 1, 3), dtype=np.uint8)
+        self.background = cv2.resize(room, (self.width, self.height), interpolation=cv2.INTER_LINEAR)
+        noise = rng.integers(-4, 5, (8, self.height, self.width, 3), dtype=np.int16)
+        self.noisy_frames = np.clip(self.background + noise, 0, 255).astype(np.uint8)
+        self.position = 0
+        return True
+
+    def is_opened(self):
+        return self.background is not None
+
+    def is_motion_frame(self, position):
+        """True when the generated figure is in view at the given frame number"""
+        return position % self.motion_period >= self.motion_period - self.motion_length
+
+    def read(self, frame=None):
+        if self.background is None or (self.frames is not None and self.position >= self.frames):
+            return False, None
+        if self.paced:
+            self.wait_for_next_frame(self.fps)
+        if frame is None or frame.shape != self.background.shape:
+            frame = np.empty_like(self.background)
+        np.copyto(frame, self.noisy_frames[self.position % len(self.noisy_frames)])
+        if self.is_motion_frame(self.position):
+            step = self.position % self.motion_period - (self.motion_period - self.motion_length)
+            figure_w = self.width // 6
+            x = int((self.width + figure_w) * step / self.motion_length) - figure_w
+            top = self.height // 5
+            cv2.rectangle(frame, (x, top), (x + figure_w, self.height - 1), (30, 30, 30), -1)
+            cv2.circle(frame, (x + figure_w // 2, top - figure_w // 3), figure_w // 3, (60, 70, 90), -1)
+        self.position += 1
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.width
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.height
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.frames or 0
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.position
+        return 0
+
+    def release(self):
+        self.background = None
+        self.noisy_frames = None
+
+
+def create_frame_source(spec, camera_index=0, loop=False, paced=False):
+    """Build a frame source from a spec string.
+
+    Specs: "camera" (uses camera_index), "camera:<index>" or a bare index,
+    "synthetic" / "synthetic:<seed>", a video file path or an image directory.
+    """
+    spec = str(spec if spec is not None else "camera").strip()
+    if spec == "camera":
+        return CameraSource(camera_index)
+    if spec.startswith("camera:"):
+        return CameraSource(int(spec.split(":", 1)[1]))
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if spec == "synthetic" or spec.startswith("synthetic:"):
+        seed = int(spec.split(":", 1)[1]) if ":" in spec else 0
+        return SyntheticSource(seed=seed, paced=paced)
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, loop=loop, paced=paced)
+    return VideoFileSource(spec, loop=loop, paced=paced)
+
+
+def open_frame_source(spec, camera_index=0, loop=False, paced=False):
+    """Create and open a frame source, returns None if it cannot be opened"""
+    source = create_frame_source(spec, camera_index, loop, paced)
+    if not source.open():
+        source.release()
+        return None
+    return source
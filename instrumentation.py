@@ -0,0 +1,179 @@
+"""
+Hot-path timing instrumentation for Privacy Guard System
+
+Stages of the detection pipeline report their durations to a PipelineProfiler,
+which keeps a rolling histogram per stage. When instrumentation is off, the
+pipeline holds no profiler and every timing point is a single `if` on None.
+"""
+
+import cProfile
+import io
+import logging
+import math
+import os
+import pstats
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Log-spaced buckets from 1 microsecond to ~10 s, 8 per decade
+BUCKETS_PER_DECADE = 8
+MIN_SECONDS = 1e-6
+BUCKET_COUNT = 7 * BUCKETS_PER_DECADE + 1
+
+
+def bucket_index(seconds):
+    if seconds <= MIN_SECONDS:
+        return 0
+    return min(BUCKET_COUNT - 1, int(math.log10(seconds / MIN_SECONDS) * BUCKETS_PER_DECADE) + 1)
+
+
+def bucket_upper(index):
+    """Upper bound in seconds of a bucket"""
+    return MIN_SECONDS * 10 ** (index / BUCKETS_PER_DECADE)
+
+
+class RollingHistogram:
+    """Log-bucketed histogram over the most recent `window` samples"""
+
+    def __init__(self, window=2000):
+        self.counts = [0] * BUCKET_COUNT
+        self.recent = deque(maxlen=window)
+        self.total = 0.0
+        self.max = 0.0
+        self.lifetime_count = 0
+
+    def add(self, seconds):
+        index = bucket_index(seconds)
+        if len(self.recent) == self.recent.maxlen:
+            old_index, old_seconds = self.recent[0]
+            self.counts[old_index] -= 1
+            self.total -= old_seconds
+        self.recent.append((index, seconds))
+        self.counts[index] += 1
+        self.total += seconds
+        self.lifetime_count += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def count(self):
+        return len(self.recent)
+
+    def mean(self):
+        return self.total / len(self.recent) if self.recent else 0.0
+
+    def percentile(self, fraction):
+        """Approximate percentile (bucket upper bound) of the window"""
+        target = fraction * len(self.recent)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return bucket_upper(index)
+        return 0.0
+
+
+class FrameTimer:
+    """Times consecutive stages of one sampled frame"""
+
+    __slots__ = ('profiler', 'last')
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.last = time.perf_counter()
+
+    def mark(self, stage):
+        """Record the time since the previous mark as `stage`"""
+        now = time.perf_counter()
+        self.profiler.record(stage, now - self.last)
+        self.last = now
+
+
+class PipelineProfiler:
+    """Per-stage rolling histograms, sampled every `sample_every` frames"""
+
+    def __init__(self, sample_every=1, window=2000):
+        self.sample_every = max(1, int(sample_every))
+        self.window = window
+        self.stages = {}
+        self.counter = 0
+        self.sampled = False
+
+    def begin(self):
+        """FrameTimer for a new frame, or None when the frame is not sampled"""
+        self.counter += 1
+        self.sampled = self.counter % self.sample_every == 0
+        return FrameTimer(self) if self.sampled else None
+
+    def follow(self):
+        """FrameTimer for a later part of the frame last passed to begin()"""
+        return FrameTimer(self) if self.sampled else None
+
+    def record(self, stage, seconds):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = RollingHistogram(self.window)
+        histogram.add(seconds)
+
+    def report(self):
+        """Lines of a per-stage timing table"""
+        total = sum(h.total for h in self.stages.values()) or 1e-9
+        lines = [f"{'stage':<14}{'samples':>8}{'mean ms':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'share':>7}"]
+        for stage, h in self.stages.items():
+            lines.append(f"{stage:<14}{h.count():>8}{h.mean() * 1000:>9.3f}"
+                         f"{h.percentile(0.5) * 1000:>8.2f}{h.percentile(0.95) * 1000:>8.2f}"
+                         f"{h.percentile(0.99) * 1000:>8.2f}{h.max * 1000:>8.2f}"
+                         f"{h.total / total * 100:>6.1f}%")
+        return lines
+
+    def dump(self, reason=""):
+        """Log the timing table"""
+        if not self.stages:
+            return
+        logger.info(f"Stage timings{f' ({reason})' if reason else ''}, "
+                    f"sampling 1/{self.sample_every} frames:\n"
+                    + "\n".join("  " + line for line in self.report()))
+
+
+class ProfileCapture:
+    """Opt-in cProfile window on the detection thread, saved under logs/"""
+
+    def __init__(self, seconds=10, directory="logs"):
+        self.seconds = seconds
+        self.directory = directory
+        self.profile = None
+        self.until = 0.0
+
+    @property
+    def active(self):
+        return self.profile is not None
+
+    def start(self):
+        if self.profile is not None:
+            return
+        self.profile = cProfile.Profile()
+        self.until = time.perf_counter() + self.seconds
+        self.profile.enable()
+        logger.info(f"cProfile capture started for {self.seconds}s")
+
+    def poll(self):
+        """Call once per frame; stops and saves the capture when the window ends"""
+        if self.profile is not None and time.perf_counter() >= self.until:
+            self.stop()
+
+    def stop(self):
+        if self.profile is None:
+            return None
+        self.profile.disable()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.profile.dump_stats(path + ".prof")
+        text = io.StringIO()
+        pstats.Stats(self.profile, stream=text).sort_stats('cumulative').print_stats(30)
+        with open(path + ".txt", 'w') as f:
+            f.write(text.getvalue())
+        self.profile = None
+        logger.info(f"cProfile capture saved: {path}.prof / {path}.txt")
+        return path
@@ -0,0 +1,227 @@
+"""
+Local Prometheus metrics endpoint for Privacy Guard System
+
+The detection loop only bumps counters and histogram buckets in GuardMetrics.
+Everything else (FPS, queue depth, RSS) is read when /metrics is scraped, on the
+server's own thread, so an idle endpoint costs nothing.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond detection up to multi-second breach actions
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram with fixed bucket bounds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name):
+        cumulative = 0
+        lines = []
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {cumulative + self.counts[-1]}')
+        lines.append(f"{name}_sum {self.sum:.6f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class RateMeter:
+    """Per-second rate of a monotonic counter between scrapes at least `min_interval` apart.
+
+    The first scrape reports the average since the meter was created.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self.last_time = time.perf_counter()
+        self.last_total = 0
+        self.rate = 0.0
+
+    def update(self, total):
+        now = time.perf_counter()
+        if total < self.last_total:
+            self.last_time, self.last_total = now, total
+        elif now - self.last_time >= self.min_interval:
+            self.rate = (total - self.last_total) / (now - self.last_time)
+            self.last_time, self.last_total = now, total
+        return self.rate
+
+
+class GuardMetrics:
+    """Counters and histograms updated by the detection loop and the action worker"""
+
+    def __init__(self):
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        # Capture timestamp to motion decision
+        self.decision_latency = Histogram()
+        # detect_motion() alone
+        self.detect_seconds = Histogram()
+        # Breach action run time, and detection to completed action
+        self.action_seconds = Histogram()
+        self.action_latency = Histogram()
+        # Control command queued to applied
+        self.control_latency = Histogram()
+        self.capture_rate = RateMeter()
+        self.processed_rate = RateMeter()
+
+    def record_frame(self, decision_latency, detect_seconds, dropped):
+        self.frames_processed += 1
+        self.frames_dropped += dropped
+        self.decision_latency.observe(decision_latency)
+        self.detect_seconds.observe(detect_seconds)
+
+    def record_action(self, latency, duration):
+        self.action_latency.observe(latency)
+        self.action_seconds.observe(duration)
+
+
+def metric(lines, name, kind, help_text, value):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"{name} {value}")
+
+
+def histogram(lines, name, help_text, hist):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    lines.extend(hist.lines(name))
+
+
+def render_metrics(guard):
+    """Prometheus text exposition of a PrivacyGuard's current state"""
+    m = guard.metrics
+    captured = guard.frames_captured_total()
+    lines = []
+    metric(lines, "privacy_guard_up", "gauge", "1 while monitoring is running", int(guard.running))
+    metric(lines, "privacy_guard_uptime_seconds", "gauge", "Seconds since start",
+           f"{time.time() - guard.start_time.timestamp():.1f}")
+    metric(lines, "privacy_guard_frames_captured_total", "counter", "Frames read from the source", captured)
+    metric(lines, "privacy_guard_frames_processed_total", "counter", "Frames run through detection",
+           m.frames_processed)
+    metric(lines, "privacy_guard_frames_dropped_total", "counter",
+           "Captured frames overwritten before detection took them", m.frames_dropped)
+    metric(lines, "privacy_guard_capture_fps", "gauge", "Capture rate since the previous scrape",
+           f"{m.capture_rate.update(captured):.2f}")
+    metric(lines, "privacy_guard_processed_fps", "gauge", "Detection rate since the previous scrape",
+           f"{m.processed_rate.update(m.frames_processed):.2f}")
+    now = time.perf_counter()
+    metric(lines, "privacy_guard_idle", "gauge", "1 while processing at the reduced idle rate",
+           int(guard.duty_cycle.idle))
+    metric(lines, "privacy_guard_idle_seconds_total", "counter", "Time spent at the idle rate",
+           f"{guard.duty_cycle.total_idle(now):.1f}")
+    if guard.time_to_ready is not None:
+        metric(lines, "privacy_guard_time_to_ready_seconds", "gauge",
+               "Capture start to first decision from a learned background", f"{guard.time_to_ready:.3f}")
+    histogram(lines, "privacy_guard_decision_latency_seconds",
+              "Capture to motion decision latency", m.decision_latency)
+    histogram(lines, "privacy_guard_detect_seconds", "Time spent in detect_motion", m.detect_seconds)
+    metric(lines, "privacy_guard_breaches_total", "counter", "Privacy breaches handled", guard.detection_count)
+    histogram(lines, "privacy_guard_action_seconds", "Breach action run time", m.action_seconds)
+    histogram(lines, "privacy_guard_action_latency_seconds",
+              "Detection to completed breach action", m.action_latency)
+    histogram(lines, "privacy_guard_control_latency_seconds",
+              "Control command received to applied", m.control_latency)
+    worker = guard.action_worker
+    metric(lines, "privacy_guard_breaches_merged_total", "counter",
+           "Breaches merged into an already pending action", worker.coalesced if worker else 0)
+    writer = guard.snapshot_writer
+    metric(lines, "privacy_guard_snapshot_queue_depth", "gauge", "Snapshots waiting to be written",
+           writer.queue_depth() if writer else 0)
+    metric(lines, "privacy_guard_snapshots_written_total", "counter", "Snapshots and clips written",
+           writer.written if writer else 0)
+    metric(lines, "privacy_guard_snapshots_dropped_total", "counter", "Snapshots dropped from a full queue",
+           writer.dropped if writer else 0)
+    if guard.monitors:
+        lines.append("# HELP privacy_guard_source_frames_total Frames run through detection per extra source")
+        lines.append("# TYPE privacy_guard_source_frames_total counter")
+        for monitor in guard.monitors:
+            lines.append(f'privacy_guard_source_frames_total{{source="{monitor.source}"}} {monitor.frames}')
+        lines.append("# HELP privacy_guard_source_cpu_seconds_total CPU time per extra source and thread")
+        lines.append("# TYPE privacy_guard_source_cpu_seconds_total counter")
+        for monitor in guard.monitors:
+            capture_cpu = monitor.capture_thread.cpu_time if monitor.capture_thread else 0.0
+            lines.append(f'privacy_guard_source_cpu_seconds_total{{source="{monitor.source}",thread="detection"}} '
+                         f'{monitor.cpu_time:.3f}')
+            lines.append(f'privacy_guard_source_cpu_seconds_total{{source="{monitor.source}",thread="capture"}} '
+                         f'{capture_cpu:.3f}')
+    metric(lines, "privacy_guard_process_resident_memory_bytes", "gauge", "Resident set size",
+           psutil.Process().memory_info().rss)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics(self.server.guard).encode()
+        except Exception as e:
+            logger.error(f"Error rendering metrics: {e}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would flood the log
+
+
+class MetricsServer:
+    """Serves /metrics for a PrivacyGuard from a background thread"""
+
+    def __init__(self, guard, host="127.0.0.1", port=9108):
+        self.guard = guard
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """Bind and start serving; returns False if the port is unavailable"""
+        try:
+            self.server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        except OSError as e:
+            logger.error(f"Cannot start metrics endpoint on {self.host}:{self.port}: {e}")
+            return False
+        self.server.daemon_threads = True
+        self.server.guard = self.guard
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="PrivacyGuardMetrics", daemon=True)
+        self.thread.start()
+        logger.info(f"Metrics endpoint: http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.thread:
+            self.thread.join(2.0)
+            self.thread = None
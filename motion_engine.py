@@ -0,0 +1,418 @@
+"""
+Motion detection engine shared by Privacy Guard and the camera test utility
+"""
+
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from detectors import DETECTORS, SPLITTABLE, create_detector
+
+logger = logging.getLogger(__name__)
+
+MotionResult = namedtuple('MotionResult', ['area', 'boxes', 'mask'])
+NO_MOTION = MotionResult(0, [], None)
+
+# Prefilter works on a tiny grayscale thumbnail of the (cropped) frame
+PREFILTER_WIDTH = 64
+# Keep running the full pipeline for this many frames after the prefilter trips
+PREFILTER_HOLD_FRAMES = 30
+# Mean gray level difference above which a restored background is rejected
+SEED_MAX_DIFFERENCE = 20
+
+
+def odd_kernel(size):
+    """Nearest odd kernel size, at least 3"""
+    return max(3, int(round(size)) | 1)
+
+
+class MotionEngine:
+    """Motion detection pipeline with precomputed kernels and reusable buffers.
+
+    The background model is a pluggable backend from detectors.DETECTORS
+    (MOG2 by default).
+
+    process() returns the total moving area and the bounding boxes, both in
+    full-frame pixels, plus the foreground mask, from a single pass. The frame
+    can be cropped to a region of interest and downscaled before processing;
+    kernel sizes and the minimum contour area scale with it.
+
+    With the prefilter enabled, each frame is first compared against the last
+    fully processed one on a tiny thumbnail. The MOG2 pipeline only runs when
+    enough thumbnail pixels changed, while motion is still being seen, or every
+    `prefilter_refresh_frames` frames so the background model stays current.
+
+    A fresh model reports no motion for its first `bootstrap_frames` frames. A
+    background saved from an earlier run can be restored with warm_start()
+    instead; it is used only if it still matches the first frame.
+
+    With `tiles` > 1 the processed frame is split into horizontal strips that
+    run on a thread pool (OpenCV releases the GIL). Each strip is blurred and
+    cleaned up with enough overlap rows that its own rows come out exactly as in
+    a whole-frame pass. Backends in detectors.SPLITTABLE get one model per strip
+    (they are per pixel anyway); others run once on the merged frame. Blobs are
+    then measured once on the merged mask, so area and boxes are identical to
+    the single-threaded result.
+    """
+
+    def __init__(self, min_area=500, detect_shadows=True, processing_resolution=None, roi=None,
+                 prefilter=False, prefilter_threshold=15, prefilter_refresh_frames=10, bootstrap_frames=0,
+                 detector="mog2", tiles=0, tile_workers=0):
+        self.min_area = min_area
+        self.detector = detector
+        self.detect_shadows = detect_shadows
+        self.processing_resolution = processing_resolution
+        self.roi = roi
+        self.prefilter = prefilter
+        self.prefilter_threshold = prefilter_threshold
+        self.prefilter_refresh_frames = prefilter_refresh_frames
+        # A fresh model reports no motion until it has learned this many frames
+        self.bootstrap_frames = bootstrap_frames
+        self.bootstrap_remaining = bootstrap_frames
+        # Persisted background (processing size, blurred gray) applied on the first frame
+        self.pending_seed = None
+        self.warm_started = False
+        self.hold_frames = 0
+        self.frames_since_full = 0
+        self.applied_frames = 0
+        self.full_runs = 0
+        self.skipped_frames = 0
+        # Whether the last processed frame showed any motion signal (prefilter trip or blob)
+        self.activity = False
+        self.thumb = self.thumb_gray = self.reference = self.diff = None
+        self.background_subtractor = create_detector(detector, detect_shadows)
+        self.frame_shape = None
+        self.geometry = None
+        self.small = self.gray = self.blurred = self.mask = self.closed = None
+        self.labels = None
+        # Tiled mode: strip count, pool size (0 = one per CPU), per-strip models
+        self.tiles = tiles
+        self.tile_workers = tile_workers or os.cpu_count() or 1
+        self.strips = None
+        self.tile_models = None
+        self.tile_masks = None
+        self.pool = None
+        # Optional instrumentation.PipelineProfiler
+        self.profiler = None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build an engine from the detection settings in a Config"""
+        if config.get('detector') not in DETECTORS:
+            logger.error(f"Unknown detector '{config.get('detector')}', using 'mog2'")
+            config.set('detector', 'mog2', save=False)
+        return cls(min_area=config.get('min_contour_area'),
+                   detect_shadows=config.get('detect_shadows'),
+                   processing_resolution=config.get('processing_resolution'),
+                   roi=config.get('detection_roi'),
+                   prefilter=config.get('motion_prefilter'),
+                   prefilter_threshold=config.get('prefilter_threshold'),
+                   prefilter_refresh_frames=config.get('prefilter_refresh_frames'),
+                   bootstrap_frames=config.get('bootstrap_frames'),
+                   detector=config.get('detector'),
+                   tiles=config.get('detection_tiles'),
+                   tile_workers=config.get('detection_threads'))
+
+    def reset(self):
+        """Forget the learned background"""
+        self.background_subtractor = create_detector(self.detector, self.detect_shadows)
+        if self.tile_models:
+            self.tile_models = [create_detector(self.detector, self.detect_shadows) for _ in self.strips]
+        self.applied_frames = 0
+        self.reference = None
+        self.bootstrap_remaining = self.bootstrap_frames
+        self.warm_started = False
+
+    @property
+    def ready(self):
+        """True once decisions come from a learned (or restored) background"""
+        return self.bootstrap_remaining == 0 and self.pending_seed is None
+
+    def warm_start(self, background):
+        """Restore a background saved by background_image(); checked against the first frame"""
+        self.pending_seed = background
+
+    def background_image(self):
+        """Learned background at processing size, None before the first full pass"""
+        if not self.applied_frames:
+            return None
+        if self.tile_models:
+            return np.vstack([model.getBackgroundImage() for model in self.tile_models])
+        return self.background_subtractor.getBackgroundImage()
+
+    def apply_seed(self, blurred):
+        """Seed the model from pending_seed unless the scene no longer matches it"""
+        seed, self.pending_seed = self.pending_seed, None
+        if seed.shape != blurred.shape:
+            return
+        if cv2.norm(seed, blurred, cv2.NORM_L1) / seed.size > SEED_MAX_DIFFERENCE:
+            return  # lighting or view changed; bootstrap instead
+        if self.tile_models:
+            for (top, bottom), model in zip(self.strips, self.tile_models):
+                model.apply(seed[top:bottom], None, 1.0)
+        else:
+            self.background_subtractor.apply(seed, None, 1.0)
+        self.bootstrap_remaining = 0
+        self.warm_started = True
+
+    def setup(self, shape):
+        """Compute crop, processing size, kernels and buffers for a frame shape"""
+        height, width = shape[:2]
+        if self.roi:
+            x, y, w, h = self.roi
+            x, y = max(0, min(int(x), width - 1)), max(0, min(int(y), height - 1))
+            w, h = max(1, min(int(w), width - x)), max(1, min(int(h), height - y))
+        else:
+            x, y, w, h = 0, 0, width, height
+        if self.processing_resolution:
+            scale_x = self.processing_resolution[0] / width
+            scale_y = self.processing_resolution[1] / height
+        else:
+            scale_x = scale_y = 1.0
+        size = (max(1, round(w * scale_x)), max(1, round(h * scale_y)))
+        # Use the exact ratio of the rounded size so boxes map back precisely
+        scale_x, scale_y = size[0] / w, size[1] / h
+        linear = min(scale_x, scale_y)
+        self.geometry = {
+            'offset': (x, y),
+            'crop': (slice(y, y + h), slice(x, x + w)),
+            # None when the crop is already at processing size
+            'size': size if size != (w, h) else None,
+            'scale': (scale_x, scale_y),
+            'blur': (odd_kernel(21 * linear),) * 2,
+            'kernel': cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (odd_kernel(5 * linear),) * 2),
+            # Contour areas shrink with the square of the scale
+            'area_scale': scale_x * scale_y,
+        }
+        # 16-bit labels are about twice as fast. The opening pass leaves every blob
+        # (plus its gap) at least 3x3 pixels, so up to this size 65535 labels suffice
+        self.geometry['label_type'] = cv2.CV_16U if size[0] * size[1] <= 65535 * 9 else cv2.CV_32S
+        thumb_size = (PREFILTER_WIDTH, max(1, round(h * PREFILTER_WIDTH / w)))
+        self.geometry['thumb_size'] = thumb_size
+        # Trip when the changed thumbnail area would cover half the minimum contour area
+        self.geometry['trip_pixels'] = max(1, self.min_area * thumb_size[0] * thumb_size[1] / (w * h) / 2)
+        self.small = None
+        self.gray = self.blurred = self.mask = self.closed = self.labels = None
+        self.thumb = self.thumb_gray = self.reference = self.diff = None
+        self.frame_shape = shape
+        self.setup_tiles(size)
+
+    def setup_tiles(self, size):
+        """Split the processed frame into strips for tiled mode (None when off or too small)"""
+        self.strips = None
+        self.tile_models = self.tile_masks = None
+        if not self.tiles or self.tiles < 2:
+            return
+        geometry = self.geometry
+        width, height = size
+        kernel = geometry['kernel'].shape[0] // 2
+        # Overlap rows: the blur radius, and four kernel radii for close (dilate, erode)
+        # followed by open (erode, dilate)
+        geometry['blur_halo'] = geometry['blur'][1] // 2
+        geometry['morph_halo'] = 4 * kernel
+        count = min(self.tiles, height // max(1, geometry['blur_halo'], geometry['morph_halo']))
+        if count < 2:
+            return
+        bounds = [round(i * height / count) for i in range(count + 1)]
+        self.strips = list(zip(bounds[:-1], bounds[1:]))
+        if self.detector in SPLITTABLE:
+            self.tile_models = [create_detector(self.detector, self.detect_shadows) for _ in self.strips]
+            self.tile_masks = [None] * count
+        self.blurred = np.empty((height, width), np.uint8)
+        self.mask = np.empty((height, width), np.uint8)
+        self.closed = np.empty((height, width), np.uint8)
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(self.tile_workers, thread_name_prefix="MotionTile")
+
+    def halo(self, index, rows):
+        """(start, stop) of strip `index` extended by `rows`, plus the strip's offset in it"""
+        top, bottom = self.strips[index]
+        start = max(0, top - rows)
+        return start, min(self.strips[-1][1], bottom + rows), top - start
+
+    def blur_strip(self, index, frame):
+        """Grayscale and blur one strip into self.blurred"""
+        start, stop, offset = self.halo(index, self.geometry['blur_halo'])
+        top, bottom = self.strips[index]
+        gray = cv2.cvtColor(frame[start:stop], cv2.COLOR_BGR2GRAY)
+        blurred = cv2.GaussianBlur(gray, self.geometry['blur'], 0)
+        self.blurred[top:bottom] = blurred[offset:offset + bottom - top]
+
+    def apply_strip(self, index, learning_rate):
+        """Run the strip's background model, writing its rows of self.mask"""
+        top, bottom = self.strips[index]
+        self.tile_masks[index] = self.tile_models[index].apply(
+            self.blurred[top:bottom], self.tile_masks[index], learning_rate)
+        self.mask[top:bottom] = self.tile_masks[index]
+
+    def morph_strip(self, index):
+        """Close and open one strip of self.mask, writing its rows of self.closed"""
+        start, stop, offset = self.halo(index, self.geometry['morph_halo'])
+        top, bottom = self.strips[index]
+        kernel = self.geometry['kernel']
+        cleaned = cv2.morphologyEx(self.mask[start:stop], cv2.MORPH_CLOSE, kernel)
+        cleaned = cv2.morphologyEx(cleaned, cv2.MORPH_OPEN, kernel, dst=cleaned)
+        self.closed[top:bottom] = cleaned[offset:offset + bottom - top]
+
+    def run_tiles(self, function, *args):
+        """Run function(index, *args) for every strip on the pool and wait for all of them"""
+        list(self.pool.map(lambda index: function(index, *args), range(len(self.strips))))
+
+    def close(self):
+        """Stop the tile worker threads"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+    def needs_full_pass(self, frame):
+        """Cheap thumbnail difference check deciding whether to run MOG2 on this frame"""
+        geometry = self.geometry
+        self.thumb = cv2.resize(frame, geometry['thumb_size'], dst=self.thumb, interpolation=cv2.INTER_AREA)
+        self.thumb_gray = cv2.cvtColor(self.thumb, cv2.COLOR_BGR2GRAY, dst=self.thumb_gray)
+        if self.reference is None or self.hold_frames > 0 or self.bootstrap_remaining \
+                or self.frames_since_full + 1 >= self.prefilter_refresh_frames:
+            return True
+        self.diff = cv2.absdiff(self.thumb_gray, self.reference, dst=self.diff)
+        _, self.diff = cv2.threshold(self.diff, self.prefilter_threshold, 255, cv2.THRESH_BINARY, dst=self.diff)
+        if cv2.countNonZero(self.diff) >= geometry['trip_pixels']:
+            self.hold_frames = PREFILTER_HOLD_FRAMES
+            self.activity = True
+            return True
+        return False
+
+    def measure_blobs(self, mask, min_area):
+        """Total area and full-frame boxes of foreground blobs larger than min_area.
+
+        One connected-components call plus NumPy reductions, so the cost does not
+        depend on how many tiny blobs noisy lighting produces. Areas are pixel
+        counts, which track cv2.contourArea of the outer contour closely.
+        """
+        count, self.labels, stats, _ = cv2.connectedComponentsWithStats(
+            mask, self.labels, connectivity=8, ltype=self.geometry['label_type'])
+        if count <= 1:
+            return 0, []
+        stats = stats[1:]  # label 0 is the background
+        kept = stats[stats[:, cv2.CC_STAT_AREA] > min_area]
+        if not len(kept):
+            return 0, []
+        offset_x, offset_y = self.geometry['offset']
+        scale_x, scale_y = self.geometry['scale']
+        boxes = np.column_stack((
+            (kept[:, cv2.CC_STAT_LEFT] / scale_x).astype(int) + offset_x,
+            (kept[:, cv2.CC_STAT_TOP] / scale_y).astype(int) + offset_y,
+            np.round(kept[:, cv2.CC_STAT_WIDTH] / scale_x).astype(int),
+            np.round(kept[:, cv2.CC_STAT_HEIGHT] / scale_y).astype(int),
+        ))
+        return int(kept[:, cv2.CC_STAT_AREA].sum()), [tuple(box) for box in boxes.tolist()]
+
+    def learning_rate(self):
+        """MOG2 learning rate that accounts for frames skipped by the prefilter"""
+        history = self.background_subtractor.getHistory()
+        if self.warm_started and self.applied_frames < history:
+            return 1.0 / history  # the restored model is already mature
+        if self.frames_since_full == 0 or self.applied_frames < history:
+            return -1  # automatic
+        return min(1.0, (self.frames_since_full + 1) / history)
+
+    def process(self, frame):
+        """Run the pipeline on a BGR frame, returns MotionResult(area, boxes, mask)"""
+        if frame.shape != self.frame_shape:
+            self.setup(frame.shape)
+        geometry = self.geometry
+        # Stage timing is only active when a profiler is attached and samples this frame
+        timer = self.profiler.begin() if self.profiler is not None else None
+        frame = frame[geometry['crop']]
+        self.activity = False
+        if self.prefilter:
+            full_pass = self.needs_full_pass(frame)
+            if timer:
+                timer.mark('prefilter')
+            if not full_pass:
+                self.frames_since_full += 1
+                self.skipped_frames += 1
+                return NO_MOTION
+            # The thumbnail of the last fully processed frame is the next reference
+            self.reference, self.thumb_gray = self.thumb_gray, self.reference
+        if geometry['size']:
+            self.small = cv2.resize(frame, geometry['size'], dst=self.small, interpolation=cv2.INTER_AREA)
+            frame = self.small
+            if timer:
+                timer.mark('resize')
+        if self.strips:
+            return self.process_tiled(frame, timer)
+        self.gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        if timer:
+            timer.mark('cvtColor')
+        self.blurred = cv2.GaussianBlur(self.gray, geometry['blur'], 0, dst=self.blurred)
+        if timer:
+            timer.mark('GaussianBlur')
+        if self.pending_seed is not None:
+            self.apply_seed(self.blurred)
+        self.mask = self.background_subtractor.apply(self.blurred, self.mask, self.learning_rate())
+        if timer:
+            timer.mark('background apply')
+        if self.count_full_pass():
+            return NO_MOTION
+        kernel = geometry['kernel']
+        self.closed = cv2.morphologyEx(self.mask, cv2.MORPH_CLOSE, kernel, dst=self.closed)
+        if timer:
+            timer.mark('morph close')
+        self.mask = cv2.morphologyEx(self.closed, cv2.MORPH_OPEN, kernel, dst=self.mask)
+        if timer:
+            timer.mark('morph open')
+        return self.finish(timer)
+
+    def count_full_pass(self):
+        """Book-keeping after the background model ran; True while still bootstrapping"""
+        self.applied_frames += 1
+        self.frames_since_full = 0
+        self.full_runs += 1
+        if self.bootstrap_remaining:
+            # Still learning: decisions would be noise
+            self.bootstrap_remaining -= 1
+            return True
+        return False
+
+    def process_tiled(self, frame, timer):
+        """Strip-parallel blur, background model and morphology, then one blob pass"""
+        if self.pending_seed is not None or not self.tile_models:
+            # The seed is checked against the whole blurred frame before any model runs
+            self.run_tiles(self.blur_strip, frame)
+            if self.pending_seed is not None:
+                self.apply_seed(self.blurred)
+            if self.tile_models:
+                self.run_tiles(self.apply_strip, self.learning_rate())
+            else:
+                self.mask = self.background_subtractor.apply(self.blurred, self.mask, self.learning_rate())
+        else:
+            learning_rate = self.learning_rate()
+            self.run_tiles(lambda index: (self.blur_strip(index, frame), self.apply_strip(index, learning_rate)))
+        if timer:
+            timer.mark('tiles: blur + background')
+        if self.count_full_pass():
+            return NO_MOTION
+        self.run_tiles(self.morph_strip)
+        # Other strips read self.mask overlap rows until all are done, so the result
+        # goes to a separate buffer
+        self.mask, self.closed = self.closed, self.mask
+        if timer:
+            timer.mark('tiles: morphology')
+        return self.finish(timer)
+
+    def finish(self, timer):
+        """Measure blobs on the cleaned mask and update the prefilter hold"""
+        geometry = self.geometry
+        motion_area, boxes = self.measure_blobs(self.mask, self.min_area * geometry['area_scale'])
+        if timer:
+            timer.mark('components')
+        if boxes:
+            self.activity = True
+        if boxes and self.prefilter:
+            self.hold_frames = PREFILTER_HOLD_FRAMES
+        elif self.hold_frames > 0:
+            self.hold_frames -= 1
+        return MotionResult(motion_area / geometry['area_scale'], boxes, self.mask)
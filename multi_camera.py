@@ -0,0 +1,112 @@
+"""
+Additional frame sources monitored alongside the primary camera
+
+Each extra source gets its own capture thread, detection thread and MotionEngine
+(so its own background model and sensitivity). The heavy OpenCV calls release
+the GIL, so sources run in parallel on separate cores. The monitoring loop fuses
+the per-source motion votes into one breach decision.
+"""
+
+import logging
+import threading
+import time
+
+from capture import FrameRingBuffer, CaptureThread
+
+logger = logging.getLogger(__name__)
+
+FUSION_RULES = ("any", "k_of_n", "weighted")
+
+
+def fuse(votes, rule="any", k=2, threshold=1.0):
+    """Combine (motion, weight) votes into one breach decision"""
+    if rule == "any":
+        return any(motion for motion, _ in votes)
+    if rule == "k_of_n":
+        return sum(1 for motion, _ in votes if motion) >= k
+    if rule == "weighted":
+        return sum(weight for motion, weight in votes if motion) >= threshold
+    raise ValueError(f"Unknown fusion rule: {rule}")
+
+
+class SourceMonitor(threading.Thread):
+    """Capture and motion detection for one extra source on its own threads"""
+
+    def __init__(self, source, engine, sensitivity, weight=1.0, buffer_size=3, snapshot_writer=None):
+        super().__init__(name=f"PrivacyGuardMonitor-{source}", daemon=True)
+        self.source = source
+        self.engine = engine
+        self.sensitivity = sensitivity
+        self.weight = weight
+        self.buffer_size = buffer_size
+        self.snapshot_writer = snapshot_writer
+        self.ring_buffer = None
+        self.capture_thread = None
+        self.running = False
+        # perf_counter timestamp of the last frame with motion above sensitivity
+        self.last_motion = 0.0
+        # Breach snapshot requested by the monitoring loop, taken by this thread
+        self.snapshot_name = None
+        # Statistics
+        self.frames = 0
+        self.dropped = 0
+        self.cpu_time = 0.0
+        self.window = (time.perf_counter(), 0, 0.0, 0.0)
+
+    def run(self):
+        size = self.source.frame_size()
+        shape = (size[1], size[0], 3) if size else None
+        self.ring_buffer = FrameRingBuffer(self.buffer_size, shape)
+        self.capture_thread = CaptureThread(self.source, self.ring_buffer)
+        self.capture_thread.start()
+        self.running = True
+        while self.running:
+            captured = self.ring_buffer.get_latest(timeout=1.0)
+            if captured is None:
+                if not self.capture_thread.is_alive():
+                    if self.running:
+                        logger.error(f"{self.source} stopped delivering frames")
+                    break
+                continue
+            result = self.engine.process(captured.frame)
+            if result.area > self.sensitivity:
+                self.last_motion = captured.timestamp
+            if self.snapshot_name is not None and self.snapshot_writer:
+                self.snapshot_writer.submit(captured.frame.copy(), self.snapshot_name)
+                self.snapshot_name = None
+            self.frames += 1
+            self.dropped += captured.dropped
+            self.cpu_time = time.thread_time()
+        self.running = False
+        self.capture_thread.stop()
+        self.source.release()
+
+    def vote(self, now, window):
+        """(motion seen within `window` seconds, weight)"""
+        return now - self.last_motion <= window, self.weight
+
+    def request_snapshot(self, name):
+        self.snapshot_name = name
+
+    def stop(self, timeout=2.0):
+        self.running = False
+        if self.is_alive():
+            self.join(timeout)
+
+    def take_stats(self):
+        """FPS and CPU share of detection / capture since the previous call"""
+        now = time.perf_counter()
+        start, frames, detect_cpu, capture_cpu = self.window
+        capture_now = self.capture_thread.cpu_time if self.capture_thread else 0.0
+        elapsed = max(now - start, 1e-6)
+        self.window = (now, self.frames, self.cpu_time, capture_now)
+        return {
+            'fps': (self.frames - frames) / elapsed,
+            'detect_cpu': (self.cpu_time - detect_cpu) / elapsed * 100,
+            'capture_cpu': (capture_now - capture_cpu) / elapsed * 100,
+        }
+
+    def summary(self):
+        stats = self.take_stats()
+        return (f"{self.source}: {stats['fps']:.1f} FPS, detection CPU {stats['detect_cpu']:.0f}%, "
+                f"capture CPU {stats['capture_cpu']:.0f}%, dropped {self.dropped}")
@@ -8,64 +8,252 @@ import cv2
 import time
 import threading
 import sys
-import os
 import numpy as np
 from datetime import datetime
 
 # Import our custom modules
 from config import Config
-from utils import (
-    setup_logging, close_and_minimize, launch_or_activate_app
-)
+from capture import FrameRingBuffer, CaptureThread, CaptureStats
+from frame_sources import CameraSource, create_frame_source
+from motion_engine import MotionEngine
+from snapshots import SnapshotWriter, PreEventBuffer
+from instrumentation import PipelineProfiler, ProfileCapture
+from metrics import GuardMetrics, MetricsServer
+from control import ControlChannel
+from multi_camera import FUSION_RULES, SourceMonitor, fuse
+from duty_cycle import DutyCycle
+from background_store import BackgroundStore
+from actions import BreachActionWorker, create_action_backend
+from utils import RateLimiter, setup_logging
 
 class PrivacyGuard:
-    def __init__(self):
+    def __init__(self, source_spec=None):
         self.config = Config()
-        self.logger = setup_logging(self.config.get('log_level'))
+        self.logger = setup_logging(self.config.get('log_level'),
+                                    max_mb=self.config.get('log_max_mb'),
+                                    backup_count=self.config.get('log_backup_count'),
+                                    retention_days=self.config.get('log_retention_days'),
+                                    rate_limit_seconds=self.config.get('log_rate_limit_seconds'))
         # Motion detection setup
         self.camera = None
-        self.background_subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=True)
+        # Frame source override (--source); falls back to the 'frame_source' setting
+        self.source_spec = source_spec
+        self.ring_buffer = None
+        self.capture_thread = None
+        # Background camera switch: worker thread, prepared source awaiting swap,
+        # and when the switch started (for the downtime report)
+        self.switch_thread = None
+        self.pending_switch = None
+        self.switch_started = None
+        # Extra sources watched alongside the primary one (see 'extra_sources')
+        self.monitors = []
+        self.last_primary_motion = 0.0
+        self.primary_cpu_window = None
+        self.duty_cycle = DutyCycle(self.config.get('idle_after_seconds'), self.config.get('idle_fps'),
+                                    self.config.get('adaptive_fps'))
+        self.capture_stats = CaptureStats()
+        # Frames captured by capture threads that have already been stopped
+        self.frames_captured_before = 0
+        self.motion_engine = MotionEngine.from_config(self.config)
+        # Learned backgrounds persisted between runs, keyed per source and geometry
+        self.background_store = BackgroundStore.from_config(self.config)
+        self.background_key = None
+        # Seconds from capture start to the first decision from a learned background
+        self.time_to_ready = None
+        self.snapshot_writer = None
+        self.pre_event_buffer = None
+        # One persistent worker (and backend) handles every breach action
+        self.action_backend = create_action_backend(self.config.get('action_backend'),
+                                                    self.config.get('process_index_interval'))
+        self.action_worker = None
+        # Stage timing; None unless enabled, so the hot path pays nothing
+        self.profiler = None
+        self.profile_capture = ProfileCapture(self.config.get('cprofile_seconds'))
         self.motion_detected = False
         self.running = False
+        self.test_mode = False
+        self.show_feed = False
+        self.control = None
         self.last_detection_time = 0
         # Statistics
         self.detection_count = 0
         self.start_time = datetime.now()
+        self.metrics = GuardMetrics()
+        self.metrics_server = None
         self.last_frame = None
+        # Overlay is drawn here, never on the captured frame
+        self.preview_frame = None
         self.logger.info("Privacy Guard initialized")
 
     def initialize_camera(self, camera_index=None):
-        """Initialize camera with specified index"""
+        """Initialize the frame source (camera with specified index by default)"""
         if camera_index is None:
             camera_index = self.config.get('camera_index')
+            spec = self.source_spec or self.config.get('frame_source')
+        else:
+            spec = "camera"
         if self.camera:
             self.camera.release()
-        self.camera = cv2.VideoCapture(camera_index)
-        if not self.camera.isOpened():
-            self.logger.error(f"Cannot access camera {camera_index}")
-            return False
+        self.camera = self.open_source(spec, camera_index)
+        return self.camera is not None
+
+    def open_source(self, spec, camera_index):
+        """Open and configure a frame source, returns it or None"""
+        source = create_frame_source(spec, camera_index, paced=True)
+        if not source.open():
+            self.logger.error(f"Cannot access {source}")
+            return None
         # Set camera properties for better performance
-        self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.camera.set(cv2.CAP_PROP_FPS, 30)
-        self.logger.info(f"Camera {camera_index} initialized successfully")
-        return True
+        source.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        source.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        source.set(cv2.CAP_PROP_FPS, 30)
+        # Frames are drained by the capture thread, keep the driver queue short
+        source.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.logger.info(f"Frame source '{source}' initialized successfully")
+        return source
+
+    def create_capture(self, source):
+        """Ring buffer and running capture thread for a source"""
+        size = source.frame_size()
+        shape = (size[1], size[0], 3) if size else None
+        ring_buffer = FrameRingBuffer(self.config.get('capture_buffer_size'), shape)
+        capture_thread = CaptureThread(source, ring_buffer)
+        capture_thread.start()
+        return ring_buffer, capture_thread
+
+    def start_capture(self):
+        """Start the capture thread feeding the ring buffer"""
+        self.ring_buffer, self.capture_thread = self.create_capture(self.camera)
+
+    def stop_capture(self):
+        """Stop the capture thread before the camera is released or replaced"""
+        if self.capture_thread:
+            self.capture_thread.stop()
+            self.frames_captured_before += self.capture_thread.frames_captured
+            self.capture_thread = None
+        if self.ring_buffer:
+            self.ring_buffer.close()
+
+    def frames_captured_total(self):
+        """Frames read from every source since startup"""
+        thread = self.capture_thread
+        return self.frames_captured_before + (thread.frames_captured if thread else 0)
+
+    def start_extra_sources(self):
+        """Open the 'extra_sources' and start a monitor thread for each"""
+        if self.config.get('fusion_rule') not in FUSION_RULES:
+            self.logger.error(f"Unknown fusion rule '{self.config.get('fusion_rule')}', using 'any'")
+            self.config.set('fusion_rule', 'any', save=False)
+        for entry in self.config.get('extra_sources'):
+            if not isinstance(entry, dict):
+                entry = {'source': entry}
+            source = self.open_source(entry['source'], self.config.get('camera_index'))
+            if source is None:
+                continue
+            monitor = SourceMonitor(source, MotionEngine.from_config(self.config),
+                                    entry.get('sensitivity', self.config.get('motion_sensitivity')),
+                                    entry.get('weight', 1.0),
+                                    self.config.get('capture_buffer_size'),
+                                    self.snapshot_writer)
+            monitor.start()
+            self.monitors.append(monitor)
+        if self.monitors:
+            self.logger.info(f"Watching {len(self.monitors) + 1} sources, fusion rule "
+                             f"'{self.config.get('fusion_rule')}'")
+
+    def primary_cpu_summary(self):
+        """CPU share of the primary source's detection and capture threads since the last call"""
+        now = time.perf_counter()
+        detect_cpu = time.thread_time()
+        capture_cpu = self.capture_thread.cpu_time if self.capture_thread else 0.0
+        last = self.primary_cpu_window
+        elapsed = max(now - last[0], 1e-6)
+        self.primary_cpu_window = (now, detect_cpu, capture_cpu)
+        return (f"{self.camera} (primary): detection CPU {(detect_cpu - last[1]) / elapsed * 100:.0f}%, "
+                f"capture CPU {max(0.0, capture_cpu - last[2]) / elapsed * 100:.0f}%")
+
+    def fuse_motion(self, primary_motion, now):
+        """Breach decision over the primary and extra sources' recent motion"""
+        if primary_motion:
+            self.last_primary_motion = now
+        if not all(monitor.is_alive() for monitor in self.monitors):
+            self.drop_dead_monitors()
+        window = self.config.get('fusion_window')
+        votes = [(now - self.last_primary_motion <= window, self.config.get('primary_weight'))]
+        votes.extend(monitor.vote(now, window) for monitor in self.monitors)
+        # k and the threshold cannot exceed what the sources still voting can reach,
+        # or no breach could ever fire
+        return fuse(votes, self.config.get('fusion_rule'), min(self.config.get('fusion_k'), len(votes)),
+                    min(self.config.get('fusion_threshold'), sum(weight for _, weight in votes)))
+
+    def drop_dead_monitors(self):
+        """Remove extra sources whose capture died so they stop voting"""
+        dead = [monitor for monitor in self.monitors if not monitor.is_alive()]
+        self.monitors = [monitor for monitor in self.monitors if monitor.is_alive()]
+        sources = len(self.monitors) + 1
+        for monitor in dead:
+            self.logger.warning(f"{monitor.source} stopped; it no longer votes ({sources} source(s) left)")
+        rule = self.config.get('fusion_rule')
+        if rule == "k_of_n" and self.config.get('fusion_k') > sources:
+            self.logger.warning(f"fusion_k {self.config.get('fusion_k')} exceeds the {sources} source(s) "
+                                f"left; a breach now needs all of them")
+        elif rule == "weighted":
+            total = self.config.get('primary_weight') + sum(monitor.weight for monitor in self.monitors)
+            if total < self.config.get('fusion_threshold'):
+                self.logger.warning(f"fusion_threshold {self.config.get('fusion_threshold')} exceeds the "
+                                    f"{total:g} weight of the sources left; a breach now needs all of them")
+
+    def restore_background(self, engine, source):
+        """Warm-start `engine` from the saved background of `source`, returns the store key"""
+        key = BackgroundStore.key(source, source.frame_size(), self.config)
+        background = self.background_store.load(key)
+        if background is not None:
+            engine.warm_start(background)
+            self.logger.info(f"Restored background model {key}")
+        return key
+
+    def save_background(self, engine=None, key=None):
+        """Persist the learned background of the (primary) engine"""
+        engine = engine or self.motion_engine
+        key = key or self.background_key
+        if key and engine.ready and self.background_store.save(key, engine.background_image()):
+            self.logger.debug(f"Saved background model {key}")
 
     def detect_motion(self, frame):
         """Standard motion detection (no masking/curtain exclusion)"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (21, 21), 0)
-        fg_mask = self.background_subtractor.apply(blurred)
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, kernel)
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, kernel)
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        motion_area = 0
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 500:  # Minimum area threshold
-                motion_area += area
-        return motion_area > self.config.get('motion_sensitivity')
+        result = self.motion_engine.process(frame)
+        return result.area > self.config.get('motion_sensitivity')
+
+    def reset_motion_engine(self):
+        """Rebuild the motion engine after detection settings changed"""
+        self.motion_engine.close()
+        self.motion_engine = MotionEngine.from_config(self.config)
+        self.motion_engine.profiler = self.profiler
+
+    def enable_instrumentation(self, enabled=True):
+        """Turn per-stage timing on or off at runtime"""
+        if enabled and self.profiler is None:
+            self.profiler = PipelineProfiler(self.config.get('instrumentation_sample_every'))
+        elif not enabled and self.profiler is not None:
+            self.profiler.dump("disabled")
+            self.profiler = None
+        self.motion_engine.profiler = self.profiler
+
+    def render_preview(self, frame, motion_detected):
+        """Draw the status overlay on a reusable copy of the frame"""
+        if self.preview_frame is None or self.preview_frame.shape != frame.shape:
+            self.preview_frame = np.empty_like(frame)
+        preview = self.preview_frame
+        np.copyto(preview, frame)
+        status_color = (0, 0, 255) if motion_detected else (0, 255, 0)
+        status_text = "MOTION DETECTED" if motion_detected else "MONITORING"
+        cv2.putText(preview, status_text, (10, 30),
+                   cv2.FONT_HERSHEY_SIMPLEX, 1, status_color, 2)
+        cv2.putText(preview, f"Detections: {self.detection_count}",
+                   (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(preview, f"Uptime: {str(datetime.now() - self.start_time).split('.')[0]}",
+                   (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        return preview
 
     def handle_privacy_breach(self):
         """Handle detected privacy breach"""
@@ -76,34 +264,36 @@ class PrivacyGuard:
         self.last_detection_time = current_time
         self.detection_count += 1
         self.logger.warning(f"Privacy breach detected! (Count: {self.detection_count})")
-        # Take and save screenshot
-        try:
-            if self.last_frame is not None:
-                if not os.path.exists("snapshots"):
-                    os.makedirs("snapshots")
-                snap_name = f"snapshots/breach_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-                cv2.imwrite(snap_name, self.last_frame)
-                self.logger.info(f"Snapshot saved: {snap_name}")
-        except Exception as e:
-            self.logger.error(f"Error saving snapshot: {e}")
-        if self.config.get('auto_close_apps'):
-            threading.Thread(target=self.close_applications, daemon=True).start()
+        # Queue the snapshot; encoding and disk I/O happen on the writer thread
+        snap_name = f"breach_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if self.last_frame is not None and self.snapshot_writer:
+            # Copy only now: the writer outlives this frame's ring buffer slot
+            self.snapshot_writer.submit(self.last_frame.copy(), snap_name)
+        if self.pre_event_buffer:
+            self.pre_event_buffer.trigger(snap_name)
+        now = time.perf_counter()
+        for number, monitor in enumerate(self.monitors, 1):
+            if monitor.vote(now, self.config.get('fusion_window'))[0]:
+                monitor.request_snapshot(f"{snap_name}_src{number}")
+        if self.config.get('auto_close_apps') and self.action_worker:
+            self.action_worker.submit()
 
     def close_applications(self):
         """Close designated apps, minimize others, open/focus comet.exe"""
         try:
             close_list = self.config.get('force_close_list')
-            closed_apps, minimized = close_and_minimize(
+            closed_apps, minimized = self.action_backend.close_and_minimize(
                 self.config.get('target_applications'),
                 self.config.get('protected_processes'),
-                close_list
+                close_list,
+                timeout=self.config.get('close_timeout')
             )
             if closed_apps:
                 self.logger.info(f"Closed applications: {', '.join(closed_apps)}")
             if minimized:
                 self.logger.info(f"Minimized windows: {len(minimized)} windows")
             # Open or focus any app or browser 
-            launch_or_activate_app("comet.exe")
+            self.action_backend.launch_or_activate_app("comet.exe")
         except Exception as e:
             self.logger.error(f"Error closing/minimizing or launching comet: {e}")
 
@@ -111,48 +301,161 @@ class PrivacyGuard:
         """Start the main monitoring loop"""
         if not self.initialize_camera():
             return False
+        self.snapshot_writer = SnapshotWriter.from_config(self.config)
+        self.snapshot_writer.start()
+        self.start_extra_sources()
+        self.background_key = self.restore_background(self.motion_engine, self.camera)
+        if self.config.get('save_breach_clips'):
+            self.pre_event_buffer = PreEventBuffer.from_config(self.snapshot_writer, self.config)
+            self.logger.info(f"Pre-event buffer: {self.pre_event_buffer.describe()}")
+        if self.config.get('auto_close_apps'):
+            self.action_backend.start()
+            self.action_worker = BreachActionWorker(self.close_applications, self.metrics.record_action)
+            self.action_worker.start()
+            self.logger.info(f"Breach actions: {self.action_backend.name} backend")
         self.running = True
+        if self.config.get('metrics_port'):
+            self.metrics_server = MetricsServer(self, self.config.get('metrics_host'),
+                                                self.config.get('metrics_port'))
+            if not self.metrics_server.start():
+                self.metrics_server = None
+        if self.config.get('control_channel'):
+            self.control = ControlChannel(self.config.get('control_address'),
+                                          self.config.get('control_authkey'),
+                                          stdin=self.config.get('control_stdin'))
+            self.control.start()
         self.logger.info("Privacy Guard monitoring started")
         print("🛡️  Privacy Guard Active")
         print("=" * 40)
-        print(f"Camera Index: {self.config.get('camera_index')}")
+        print(f"Frame Source: {self.camera}")
         print(f"Motion Sensitivity: {self.config.get('motion_sensitivity')}")
         print(f"Detection Delay: {self.config.get('detection_delay')}s")
+        if self.config.get('headless'):
+            print("Headless: no preview window or keyboard controls (Ctrl+C to stop)")
         print("\nControls:")
         print("  'q' - Quit")
         print("  'c' - Change camera")
         print("  's' - Adjust sensitivity")
         print("  't' - Test mode (show detection)")
         print("  'h' - Hide/Show camera feed")
+        print("  'p' - Dump stage timings (starts timing if off)")
+        print("  'P' - Capture a cProfile window")
+        if self.control:
+            print("Commands (type here or use --control): sensitivity N, camera N, "
+                  "test on|off, feed on|off, status, quit")
         print("-" * 40)
-        show_feed = self.config.get('show_camera_feed')
-        test_mode = False
+        headless = self.config.get('headless')
+        self.show_feed = self.config.get('show_camera_feed') and not headless
+        preview_interval = 1.0 / max(0.1, self.config.get('preview_fps'))
+        next_preview = 0.0
+        motion_since_preview = False
+        self.test_mode = False
+        test_mode_prints = RateLimiter(1.0)
+        stats_interval = self.config.get('stats_log_interval')
+        if self.config.get('instrumentation'):
+            self.enable_instrumentation()
+        dump_interval = self.config.get('instrumentation_dump_interval')
+        last_dump = time.perf_counter()
+        save_interval = self.config.get('background_save_interval')
+        self.time_to_ready = None
+        self.start_capture()
+        capture_started = last_background_save = time.perf_counter()
+        self.primary_cpu_window = (time.perf_counter(), time.thread_time(), 0.0)
         try:
             while self.running:
-                ret, frame = self.camera.read()
-                if not ret:
-                    self.logger.error("Failed to read camera frame")
-                    break
-                self.last_frame = frame.copy()
+                if self.pending_switch is not None:
+                    last_old_frame = time.perf_counter()
+                    self.swap_source()
+                wait = self.duty_cycle.wait_time(time.perf_counter())
+                if wait:
+                    # Idle: skip ahead to the newest frame instead of counting the rest as drops
+                    time.sleep(wait)
+                    self.ring_buffer.discard_backlog()
+                captured = self.ring_buffer.get_latest(timeout=1.0)
+                if captured is None:
+                    if self.capture_thread is None or not self.capture_thread.is_alive():
+                        if self.camera.live:
+                            self.logger.error("Failed to read camera frame")
+                        else:
+                            self.logger.info(f"End of {self.camera}")
+                        break
+                    continue
+                # The claimed ring slot stays untouched until the next get_latest(),
+                # so it doubles as the last frame without a per-frame copy
+                frame = captured.frame
+                self.last_frame = frame
+                if self.pre_event_buffer:
+                    self.pre_event_buffer.add(frame, captured.timestamp)
+                detect_start = time.perf_counter()
                 motion_detected = self.detect_motion(frame)
+                if self.monitors:
+                    motion_detected = self.fuse_motion(motion_detected, captured.timestamp)
+                decided = time.perf_counter()
+                self.duty_cycle.update(decided, motion_detected or self.motion_engine.activity)
+                if self.time_to_ready is None and self.motion_engine.ready:
+                    self.time_to_ready = decided - capture_started
+                    mode = "restored background" if self.motion_engine.warm_started else \
+                        f"bootstrap over {self.motion_engine.bootstrap_frames} frames"
+                    self.logger.info(f"First reliable decision {self.time_to_ready * 1000:.0f} ms after start ({mode})")
+                if save_interval and decided - last_background_save >= save_interval \
+                        and not motion_detected and not self.motion_engine.activity:
+                    self.save_background()
+                    last_background_save = decided
+                self.capture_stats.record(decided - captured.timestamp, captured.dropped)
+                self.metrics.record_frame(decided - captured.timestamp, decided - detect_start, captured.dropped)
+                if self.switch_started is not None:
+                    self.logger.info(f"Switched to {self.camera}: ready {last_old_frame - self.switch_started:.2f}s "
+                                     f"after the request, detection gap {(decided - last_old_frame) * 1000:.0f} ms"
+                                     + ("" if self.motion_engine.ready else
+                                        f", still bootstrapping for {self.motion_engine.bootstrap_remaining} frames"))
+                    self.switch_started = None
+                if self.capture_stats.elapsed() >= stats_interval:
+                    self.logger.info(f"Capture stats: {self.capture_stats.summary()}")
+                    if self.monitors:
+                        self.logger.info("Sources: " + "; ".join(
+                            [self.primary_cpu_summary()] + [monitor.summary() for monitor in self.monitors]))
+                    self.logger.info(f"Snapshots: {self.snapshot_writer.summary()}")
+                    if self.pre_event_buffer:
+                        self.logger.info(f"Pre-event buffer: {self.pre_event_buffer.summary()}")
+                    self.capture_stats.reset()
                 if motion_detected:
-                    if not test_mode:
+                    if not self.test_mode:
                         self.handle_privacy_breach()
                     else:
-                        print(f"🚨 Motion detected (TEST MODE) - {datetime.now().strftime('%H:%M:%S')}")
-                # Display camera feed if enabled
-                if show_feed:
-                    status_color = (0, 0, 255) if motion_detected else (0, 255, 0)
-                    status_text = "MOTION DETECTED" if motion_detected else "MONITORING"
-                    cv2.putText(frame, status_text, (10, 30),
-                               cv2.FONT_HERSHEY_SIMPLEX, 1, status_color, 2)
-                    cv2.putText(frame, f"Detections: {self.detection_count}",
-                               (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                    cv2.putText(frame, f"Uptime: {str(datetime.now() - self.start_time).split('.')[0]}",
-                               (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                    cv2.imshow('Privacy Guard - Camera Feed', frame)
+                        # Motion spans many consecutive frames; print at most once a second
+                        allowed, repeats = test_mode_prints.allow('motion')
+                        if allowed:
+                            print(f"🚨 Motion detected (TEST MODE) - {datetime.now().strftime('%H:%M:%S')}"
+                                  + (f" (+{repeats} frames)" if repeats else ""))
+                if self.profiler is not None and dump_interval and \
+                        time.perf_counter() - last_dump >= dump_interval:
+                    self.profiler.dump("periodic")
+                    last_dump = time.perf_counter()
+                if self.profile_capture.active:
+                    self.profile_capture.poll()
+                command = self.control.poll() if self.control else None
+                while command is not None:
+                    self.apply_command(command)
+                    command = self.control.poll()
+                if headless:
+                    continue
+                motion_since_preview = motion_since_preview or motion_detected
+                # Overlay, imshow and key polling run at the preview rate, not per frame
+                now = time.perf_counter()
+                if now < next_preview:
+                    continue
+                next_preview = max(next_preview + preview_interval, now)
+                timer = self.profiler.follow() if self.profiler is not None else None
+                if self.show_feed:
+                    self.render_preview(frame, motion_since_preview)
+                    if timer:
+                        timer.mark('overlay')
+                    cv2.imshow('Privacy Guard - Camera Feed', self.preview_frame)
+                motion_since_preview = False
                 # Handle keyboard input
                 key = cv2.waitKey(1) & 0xFF
+                if timer:
+                    timer.mark('imshow/waitKey')
                 if key == ord('q'):
                     break
                 elif key == ord('c'):
@@ -160,61 +463,225 @@ class PrivacyGuard:
                 elif key == ord('s'):
                     self.adjust_sensitivity()
                 elif key == ord('t'):
-                    test_mode = not test_mode
-                    print(f"Test mode: {'ON' if test_mode else 'OFF'}")
+                    print(self.run_command("test toggle"))
+                elif key == ord('p'):
+                    if self.profiler is None:
+                        self.enable_instrumentation()
+                        print("Stage timing: ON (press 'p' again to dump)")
+                    else:
+                        self.profiler.dump("keypress")
+                elif key == ord('P'):
+                    self.profile_capture.start()
                 elif key == ord('h'):
-                    show_feed = not show_feed
-                    if not show_feed:
-                        cv2.destroyAllWindows()
+                    self.run_command("feed toggle")
         except KeyboardInterrupt:
             self.logger.info("Monitoring stopped by user")
         finally:
             self.stop_monitoring()
         return True
 
-    def change_camera(self):
-        """Change camera source"""
-        print("\nAvailable cameras:")
-        for i in range(5):
-            cap = cv2.VideoCapture(i)
-            if cap.isOpened():
-                print(f"  {i}: Available")
-                cap.release()
+    def apply_command(self, command):
+        """Apply a queued ControlCommand and answer its sender"""
+        reply = self.run_command(command.text)
+        latency = time.perf_counter() - command.received_at
+        self.metrics.control_latency.observe(latency)
+        self.logger.info(f"Control ({command.source}): '{command.text}' -> {reply} "
+                         f"({latency * 1000:.1f} ms)")
+        command.complete(reply)
+
+    def run_command(self, text):
+        """Execute a control command on the monitoring thread, returns the reply text"""
+        parts = text.split()
+        if not parts:
+            return "error: empty command"
+        name, args = parts[0].lower(), parts[1:]
+        if name == "sensitivity" and len(args) == 1:
+            return self.set_sensitivity(args[0])
+        if name == "camera" and len(args) == 1:
+            return self.change_camera(args[0])
+        if name in ("test", "feed") and len(args) <= 1:
+            attr = 'test_mode' if name == "test" else 'show_feed'
+            value = args[0].lower() if args else "toggle"
+            if value not in ("on", "off", "toggle"):
+                return "error: expected on, off or toggle"
+            if name == "feed" and self.config.get('headless'):
+                return "error: no preview in headless mode"
+            enabled = not getattr(self, attr) if value == "toggle" else value == "on"
+            setattr(self, attr, enabled)
+            if name == "feed" and not enabled:
+                cv2.destroyAllWindows()
+            return f"{'Test mode' if name == 'test' else 'Camera feed'}: {'ON' if enabled else 'OFF'}"
+        if name == "status":
+            return (f"source={self.camera}, sensitivity={self.config.get('motion_sensitivity')}, "
+                    f"test_mode={self.test_mode}, feed={self.show_feed}, detections={self.detection_count}")
+        if name == "quit":
+            self.running = False
+            return "stopping"
+        return ("error: unknown command; use sensitivity N, camera N, test on|off|toggle, "
+                "feed on|off|toggle, status, quit")
+
+    def change_camera(self, value=None):
+        """Change camera source.
+
+        Without a value, lists cameras on a background thread and explains how
+        to pick one; the loop keeps running either way.
+        """
+        if value is None:
+            from utils import get_available_cameras
+
+            # Never reopen the camera that is capturing right now
+            in_use = self.camera.index if isinstance(self.camera, CameraSource) and self.camera.live else None
+
+            def list_cameras():
+                try:
+                    cameras = get_available_cameras(skip=(in_use,) if in_use is not None else ())
+                except Exception as e:
+                    self.logger.error(f"Camera listing failed: {e}")
+                    print(f"❌ Cannot list cameras: {e}")
+                    return
+                print("\nAvailable cameras:")
+                for camera in cameras:
+                    print(f"  {camera['index']}: {camera['resolution'][0]}x{camera['resolution'][1]}"
+                          + (" (in use)" if camera['index'] == in_use else ""))
+                print("Type 'camera N' to switch")
+            threading.Thread(target=list_cameras, name="PrivacyGuardCameraList", daemon=True).start()
+            return "listing cameras"
         try:
-            new_camera = int(input("Enter new camera index: "))
-            if self.initialize_camera(new_camera):
-                self.config.set('camera_index', new_camera)
-                print(f"✅ Switched to camera {new_camera}")
-            else:
-                print("❌ Failed to switch camera")
+            new_camera = int(value)
         except ValueError:
-            print("❌ Invalid camera index")
+            return "error: invalid camera index"
+        if self.switch_thread is not None and self.switch_thread.is_alive() or self.pending_switch:
+            return "error: a camera switch is already in progress"
+        # Detection keeps running on the current source while the new one opens
+        self.switch_thread = threading.Thread(target=self.prepare_switch, args=(new_camera,),
+                                              name="PrivacyGuardCameraSwitch", daemon=True)
+        self.switch_thread.start()
+        return f"opening camera {new_camera} in the background"
+
+    def prepare_switch(self, camera_index):
+        """Open, warm up and start capturing from a new camera (switch thread)"""
+        started = time.perf_counter()
+        source = self.open_source("camera", camera_index)
+        if source is None:
+            self.logger.error(f"Camera switch to {camera_index} failed; staying on {self.camera}")
+            return
+        # Prime the background model (restored or bootstrapped) so detection is valid
+        # from the first swapped frame
+        engine = MotionEngine.from_config(self.config)
+        key = self.restore_background(engine, source)
+        deadline = started + self.config.get('camera_warmup_timeout')
+        warmed = 0
+        while warmed < self.config.get('camera_warmup_frames') or not engine.ready:
+            if time.perf_counter() > deadline:
+                self.logger.warning(f"Camera {camera_index} background not ready after "
+                                    f"{self.config.get('camera_warmup_timeout')}s of warm-up; switching anyway")
+                break
+            warmed += 1
+            ret, frame = source.read()
+            if not ret:
+                self.logger.error(f"Camera {camera_index} opened but delivers no frames; "
+                                  f"staying on {self.camera}")
+                source.release()
+                return
+            engine.process(frame)
+        ring_buffer, capture_thread = self.create_capture(source)
+        # Only hand over once the new capture thread is delivering frames
+        if ring_buffer.wait_for_frame(timeout=5.0):
+            self.pending_switch = (camera_index, source, ring_buffer, capture_thread, engine, key, started)
+        else:
+            self.logger.error(f"Camera {camera_index} stalled after warm-up; staying on {self.camera}")
+            capture_thread.stop()
+            source.release()
+
+    def swap_source(self):
+        """Make the prepared source active (monitoring thread); the old one is retired in the background"""
+        camera_index, source, ring_buffer, capture_thread, engine, key, started = self.pending_switch
+        self.pending_switch = None
+        self.save_background()
+        self.background_key = key
+        old_camera, old_thread = self.camera, self.capture_thread
+        engine.profiler = self.profiler
+        # Frames captured while waiting for the swap are not drops
+        ring_buffer.discard_backlog()
+        self.camera, self.ring_buffer, self.capture_thread = source, ring_buffer, capture_thread
+        self.motion_engine.close()
+        self.motion_engine = engine
+        self.switch_started = started
+        self.config.set('camera_index', camera_index)
+
+        def retire():
+            if old_thread:
+                old_thread.stop()
+                self.frames_captured_before += old_thread.frames_captured
+            if old_camera:
+                old_camera.release()
+        threading.Thread(target=retire, name="PrivacyGuardRetireSource", daemon=True).start()
 
     def adjust_sensitivity(self):
-        """Adjust motion detection sensitivity"""
+        """Show the sensitivity guide; the new value arrives as a 'sensitivity N' command"""
         current = self.config.get('motion_sensitivity')
         print(f"\nCurrent sensitivity: {current}")
         print("Sensitivity guide:")
         print("  500-1000: Very sensitive (detects small movements)")
         print("  1000-2000: Normal sensitivity")
         print("  2000-5000: Less sensitive (larger movements only)")
+        print("Type 'sensitivity N' (500-5000) to change it")
+
+    def set_sensitivity(self, value):
         try:
-            new_sensitivity = int(input("Enter new sensitivity (500-5000): "))
-            if 500 <= new_sensitivity <= 5000:
-                self.config.set('motion_sensitivity', new_sensitivity)
-                print(f"✅ Sensitivity set to {new_sensitivity}")
-            else:
-                print("❌ Sensitivity must be between 500-5000")
+            new_sensitivity = int(value)
         except ValueError:
-            print("❌ Invalid sensitivity value")
+            return "error: invalid sensitivity value"
+        if not 500 <= new_sensitivity <= 5000:
+            return "error: sensitivity must be between 500-5000"
+        self.config.set('motion_sensitivity', new_sensitivity)
+        return f"sensitivity set to {new_sensitivity}"
 
     def stop_monitoring(self):
         """Stop monitoring and cleanup"""
         self.running = False
+        if self.control:
+            self.control.stop()
+            self.control = None
+        if self.pending_switch is not None:
+            _, source, _, capture_thread, _, _, _ = self.pending_switch
+            self.pending_switch = None
+            capture_thread.stop()
+            source.release()
+        self.stop_capture()
         if self.camera:
             self.camera.release()
-        cv2.destroyAllWindows()
+        self.save_background()
+        for monitor in self.monitors:
+            monitor.stop()
+        if self.monitors:
+            self.logger.info("Sources: " + "; ".join(monitor.summary() for monitor in self.monitors))
+        self.monitors = []
+        if not self.config.get('headless'):
+            cv2.destroyAllWindows()
         uptime = datetime.now() - self.start_time
+        if self.profile_capture.active:
+            self.profile_capture.stop()
+        if self.profiler is not None:
+            self.profiler.dump("shutdown")
+        if self.capture_stats.frames:
+            self.logger.info(f"Capture stats: {self.capture_stats.summary()}")
+        if self.config.get('adaptive_fps'):
+            self.logger.info(f"Adaptive FPS: {self.duty_cycle.summary(time.perf_counter(), uptime.total_seconds())}")
+        if self.ring_buffer:
+            self.logger.info(f"Total dropped frames: {self.ring_buffer.dropped_total}")
+        if self.action_worker:
+            self.action_worker.stop()
+            self.action_backend.stop()
+            self.logger.info(f"Breach actions: {self.action_worker.summary()}")
+        if self.pre_event_buffer:
+            self.pre_event_buffer.finish_clip()
+        if self.snapshot_writer:
+            self.snapshot_writer.stop()
+            self.logger.info(f"Snapshots: {self.snapshot_writer.summary()}")
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
         self.logger.info(f"Privacy Guard stopped. Uptime: {uptime}, Detections: {self.detection_count}")
         print(f"\n🛡️  Privacy Guard stopped")
         print(f"Total detections: {self.detection_count}")
@@ -225,30 +692,122 @@ def main():
     print("🚀 Privacy Guard System v1.0")
     from utils import check_dependencies
     missing = check_dependencies()
+    bench_spec = None
+    bench_frames = None
+    resolution = None
+    if '--bench' in sys.argv or '--control' in sys.argv:
+        # Benchmarks and control clients never touch windows or processes, so pywin32 is optional
+        missing = [m for m in missing if m != 'win32gui']
     if missing:
         print(f"❌ Missing dependencies: {', '.join(missing)}")
         print("Run: pip install -r requirements.txt")
         return
     camera_index = None
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--camera' and len(sys.argv) > 2:
+    source_spec = None
+    headless = False
+    args = sys.argv[1:]
+    while args:
+        arg = args.pop(0)
+        if arg == '--camera' and args:
             try:
-                camera_index = int(sys.argv[2])
+                camera_index = int(args.pop(0))
             except ValueError:
                 print("❌ Invalid camera index")
                 return
-        elif sys.argv[1] == '--test':
+        elif arg == '--source' and args:
+            source_spec = args.pop(0)
+        elif arg == '--headless':
+            headless = True
+        elif arg == '--control' and args:
+            from control import send_command
+            config = Config()
+            try:
+                print(send_command(args.pop(0), config.get('control_address'), config.get('control_authkey')))
+            except (OSError, TimeoutError) as e:
+                print(f"❌ Cannot reach Privacy Guard: {e}")
+            return
+        elif arg == '--bench' and args:
+            bench_spec = args.pop(0)
+        elif arg == '--resolution' and args:
+            try:
+                resolution = [int(v) for v in args.pop(0).lower().split('x')]
+                if len(resolution) != 2:
+                    raise ValueError
+            except ValueError:
+                print("❌ Invalid resolution, expected WIDTHxHEIGHT")
+                return
+        elif arg == '--frames' and args:
+            try:
+                bench_frames = int(args.pop(0))
+            except ValueError:
+                print("❌ Invalid frame count")
+                return
+        elif arg == '--test':
             from test_camera import interactive_camera_test
-            interactive_camera_test()
+            interactive_camera_test(source_spec)
             return
-        elif sys.argv[1] == '--help':
+        elif arg == '--help':
             print("\nUsage:")
             print("  python privacy_guard.py                    # Run with default settings")
             print("  python privacy_guard.py --camera 1         # Use specific camera")
+            print("  python privacy_guard.py --source clip.mp4  # Use a video, image folder or 'synthetic'")
+            print("  python privacy_guard.py --headless         # Run without preview window or key controls")
+            print("  python privacy_guard.py --control \"sensitivity 1200\"  # Send a command to a running guard")
             print("  python privacy_guard.py --test             # Test cameras")
+            print("  python privacy_guard.py --bench synthetic  # Benchmark detection on a clip or 'synthetic'")
+            print("  python privacy_guard.py --bench clip.mp4 --frames 300")
+            print("  python privacy_guard.py --bench blobs      # Blob measurement micro-benchmark")
+            print("  python privacy_guard.py --bench multi:4    # Concurrent multi-source scaling")
+            print("  python privacy_guard.py --bench duty       # Adaptive FPS savings and added latency")
+            print("  python privacy_guard.py --bench detectors:clip.mp4,synthetic  # Compare detector backends")
+            print("  python privacy_guard.py --bench warmstart  # Startup false positives with a restored background")
+            print("  python privacy_guard.py --bench tiles --resolution 3840x2160  # Tiled detection speedup by threads")
+            print("  python privacy_guard.py --resolution 320x240  # Detect at a lower processing resolution")
             print("  python privacy_guard.py --help             # Show this help")
             return
-    guard = PrivacyGuard()
+    if bench_spec == 'blobs':
+        from benchmark import run_blob_benchmark
+        run_blob_benchmark()
+        return
+    if bench_spec is not None and (bench_spec == 'detectors' or bench_spec.startswith('detectors:')):
+        from benchmark import run_detector_benchmark
+        specs = bench_spec.split(':', 1)[1].split(',') if ':' in bench_spec else ["synthetic"]
+        run_detector_benchmark(specs, bench_frames)
+        return
+    if bench_spec is not None and (bench_spec == 'tiles' or bench_spec.startswith('tiles:')):
+        from benchmark import run_tile_benchmark
+        run_tile_benchmark(bench_spec.split(':', 1)[1] if ':' in bench_spec else None, bench_frames,
+                           tuple(resolution) if resolution else (1920, 1080))
+        return
+    if bench_spec == 'warmstart':
+        from benchmark import run_warm_start_benchmark
+        run_warm_start_benchmark(bench_frames)
+        return
+    if bench_spec is not None and (bench_spec == 'duty' or bench_spec.startswith('duty:')):
+        from benchmark import run_duty_benchmark
+        run_duty_benchmark(bench_spec.split(':', 1)[1] if ':' in bench_spec else None, bench_frames)
+        return
+    if bench_spec is not None and (bench_spec == 'multi' or bench_spec.startswith('multi:')):
+        from benchmark import run_multi_benchmark
+        try:
+            count = int(bench_spec.split(':', 1)[1]) if ':' in bench_spec else 4
+        except ValueError:
+            print("❌ Invalid source count, expected multi:N")
+            return
+        run_multi_benchmark(count, bench_frames or 300)
+        return
+    if bench_spec is not None:
+        from benchmark import run_benchmark
+        run_benchmark(bench_spec, bench_frames, resolution)
+        return
+    if camera_index is not None and source_spec is None:
+        source_spec = "camera"
+    guard = PrivacyGuard(source_spec)
+    if headless:
+        guard.config.set('headless', True, save=False)
+    if resolution is not None:
+        guard.config.set('processing_resolution', resolution, save=False)
+        guard.reset_motion_engine()
     if camera_index is not None:
         guard.config.set('camera_index', camera_index)
     try:
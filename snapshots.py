@@ -0,0 +1,228 @@
+"""
+Background snapshot writing for Privacy Guard System
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+ENCODE_PARAMS = {
+    'jpg': lambda quality: [cv2.IMWRITE_JPEG_QUALITY, int(quality)],
+    'jpeg': lambda quality: [cv2.IMWRITE_JPEG_QUALITY, int(quality)],
+    'webp': lambda quality: [cv2.IMWRITE_WEBP_QUALITY, int(quality)],
+    'png': lambda quality: [cv2.IMWRITE_PNG_COMPRESSION, 3],
+}
+
+
+class SnapshotWriter:
+    """Encodes and writes breach snapshots on a background thread.
+
+    The detection loop only appends to a bounded queue. When the disk cannot keep
+    up the oldest pending snapshot is dropped, so submit() never blocks.
+    """
+
+    def __init__(self, directory="snapshots", image_format="jpg", quality=90, scale=1.0, queue_size=8):
+        image_format = image_format.lower().lstrip('.')
+        if image_format not in ENCODE_PARAMS:
+            raise ValueError(f"Unsupported snapshot format: {image_format}")
+        self.directory = directory
+        self.image_format = image_format
+        self.params = ENCODE_PARAMS[image_format](quality)
+        self.scale = scale
+        self.queue = deque(maxlen=max(1, queue_size))
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+        # Statistics
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(directory=config.get('snapshot_dir'),
+                   image_format=config.get('snapshot_format'),
+                   quality=config.get('snapshot_quality'),
+                   scale=config.get('snapshot_scale'),
+                   queue_size=config.get('snapshot_queue_size'))
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="PrivacyGuardSnapshots", daemon=True)
+        self.thread.start()
+
+    def submit(self, frame, name):
+        """Queue a frame the caller will not modify again; returns the target path"""
+        return self.enqueue(frame, os.path.join(self.directory, f"{name}.{self.image_format}"))
+
+    def submit_clip(self, frames, name, fps):
+        """Queue a list of JPEG-encoded frames to be written as an MJPG .avi clip"""
+        return self.enqueue((frames, fps), os.path.join(self.directory, f"{name}.avi"))
+
+    def enqueue(self, job, path):
+        with self.cond:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+                logger.warning(f"Snapshot queue full, dropping {self.queue[0][1]}")
+            self.queue.append((job, path, time.perf_counter()))
+            self.cond.notify()
+        return path
+
+    def queue_depth(self):
+        with self.cond:
+            return len(self.queue)
+
+    def run(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.queue or not self.running)
+                if not self.queue:
+                    return
+                job, path, queued_at = self.queue.popleft()
+            self.write(job, path, queued_at)
+
+    def write(self, job, path, queued_at):
+        try:
+            if isinstance(job, tuple):
+                self.write_clip(path, *job)
+            else:
+                self.write_image(path, job)
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error saving snapshot {path}: {e}")
+            return
+        latency = time.perf_counter() - queued_at
+        self.written += 1
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        logger.info(f"Snapshot saved: {path} ({latency * 1000:.0f} ms after queueing)")
+
+    def write_image(self, path, frame):
+        if self.scale != 1.0:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        if not cv2.imwrite(path, frame, self.params):
+            raise IOError("imwrite failed")
+
+    def write_clip(self, path, frames, fps):
+        writer = None
+        try:
+            for encoded in frames:
+                frame = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+                    if not writer.isOpened():
+                        raise IOError("cannot open video writer")
+                writer.write(frame)
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def stop(self, timeout=5.0):
+        """Flush pending snapshots and stop the writer thread"""
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def summary(self):
+        avg_ms = self.total_latency / self.written * 1000 if self.written else 0.0
+        return (f"{self.written} written, {self.dropped} dropped, {self.failed} failed, "
+                f"queue depth {self.queue_depth()}, write latency avg {avg_ms:.0f} ms / "
+                f"max {self.max_latency * 1000:.0f} ms")
+
+
+class PreEventBuffer:
+    """Memory-bounded history of recent frames for breach clips.
+
+    Frames are sampled at `fps`, downscaled and kept JPEG-encoded, and evicted
+    once older than `pre_seconds` or when the total exceeds `max_bytes`, so the
+    footprint stays flat over days of uptime. trigger() freezes the history and
+    keeps collecting for `post_seconds`; the finished clip goes to the
+    SnapshotWriter.
+    """
+
+    def __init__(self, writer, pre_seconds=3, post_seconds=2, fps=10, scale=0.5, quality=70,
+                 max_bytes=8 * 1024 * 1024):
+        self.writer = writer
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.scale = scale
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        # Bounds the history; a clip in progress adds at most post_seconds * fps frames
+        self.max_bytes = max_bytes
+        self.frames = deque()
+        self.bytes = 0
+        self.next_sample = 0.0
+        self.small = None
+        self.clip = None
+        self.clip_name = None
+        self.clip_end = 0.0
+
+    @classmethod
+    def from_config(cls, writer, config):
+        return cls(writer,
+                   pre_seconds=config.get('clip_pre_seconds'),
+                   post_seconds=config.get('clip_post_seconds'),
+                   fps=config.get('clip_fps'),
+                   scale=config.get('clip_scale'),
+                   quality=config.get('clip_quality'),
+                   max_bytes=int(config.get('clip_max_mb') * 1024 * 1024))
+
+    def add(self, frame, timestamp):
+        """Offer a frame captured at `timestamp` (perf_counter); only sampled frames are kept"""
+        if timestamp < self.next_sample:
+            return
+        self.next_sample = max(self.next_sample + 1.0 / self.fps, timestamp)
+        if self.scale != 1.0:
+            self.small = cv2.resize(frame, None, dst=self.small, fx=self.scale, fy=self.scale,
+                                    interpolation=cv2.INTER_AREA)
+            frame = self.small
+        ok, encoded = cv2.imencode('.jpg', frame, self.params)
+        if not ok:
+            return
+        if self.clip is not None:
+            self.clip.append(encoded)
+            if timestamp >= self.clip_end:
+                self.finish_clip()
+        self.frames.append((timestamp, encoded))
+        self.bytes += encoded.nbytes
+        while self.frames and (self.bytes > self.max_bytes
+                               or self.frames[0][0] < timestamp - self.pre_seconds):
+            self.bytes -= self.frames.popleft()[1].nbytes
+
+    def trigger(self, name):
+        """Start a clip: the buffered history plus the next `post_seconds` of frames"""
+        if self.clip is not None:
+            return
+        self.clip = [encoded for _, encoded in self.frames]
+        self.clip_name = name
+        self.clip_end = time.perf_counter() + self.post_seconds
+
+    def finish_clip(self):
+        """Hand the current clip (if any) to the writer"""
+        if self.clip:
+            self.writer.submit_clip(self.clip, self.clip_name, self.fps)
+        self.clip = None
+
+    def describe(self):
+        """Startup description of the buffer and its memory bound"""
+        return (f"{self.pre_seconds}s before / {self.post_seconds}s after each breach at {self.fps} FPS, "
+                f"{self.scale}x JPEG, capped at {self.max_bytes / (1024 * 1024):.1f} MB")
+
+    def summary(self):
+        return f"{len(self.frames)} frames, {self.bytes / 1024:.0f} KB of {self.max_bytes / 1024:.0f} KB"
@@ -4,10 +4,15 @@ Advanced Camera Testing Utility for Privacy Guard System
 """
 
 import cv2
+import os
+import re
 import sys
 import time
 import numpy as np
 from utils import get_available_cameras, setup_logging
+from config import Config
+from frame_sources import open_frame_source
+from motion_engine import MotionEngine
 
 # -------- Line measurement state --------
 measuring = False
@@ -15,6 +20,9 @@ measure_start = None
 measure_end = None
 last_line_length = None
 
+# Shared with privacy_guard.py so tuning here carries over to monitoring
+motion_engine = None
+
 def list_standard_resolutions():
     return [
         (640, 480),
@@ -36,16 +44,17 @@ def print_camera_properties(cap):
     except Exception:
         pass
 
-def test_all_cameras():
+def test_all_cameras(refresh=False):
     logger = setup_logging()
-    cameras = get_available_cameras()
+    cameras = get_available_cameras(refresh)
     if not cameras:
         print("❌ No cameras found!")
         return False
     print("📷 Available Cameras:")
     print("-" * 50)
     for camera in cameras:
-        print(f"Camera {camera['index']}: {camera['resolution'][0]}x{camera['resolution'][1]}")
+        print(f"Camera {camera['index']}: {camera['resolution'][0]}x{camera['resolution'][1]}"
+              f" @ {camera['fps']:g} FPS")
         if camera['index'] == 0:
             print("  └─ Likely: Laptop built-in camera")
         else:
@@ -60,21 +69,11 @@ def show_frame_modes(frame, mode):
     return frame
 
 def detect_motion_rects(frame):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    blurred = cv2.GaussianBlur(gray, (21, 21), 0)
-    if not hasattr(detect_motion_rects, "bg_subtractor"):
-        detect_motion_rects.bg_subtractor = cv2.createBackgroundSubtractorMOG2()
-    fg_mask = detect_motion_rects.bg_subtractor.apply(blurred)
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-    fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, kernel)
-    fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, kernel)
-    contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    boxes = []
-    for cnt in contours:
-        if cv2.contourArea(cnt) > 600:
-            x, y, w, h = cv2.boundingRect(cnt)
-            boxes.append((x, y, w, h))
-    return boxes
+    """Motion boxes from the same engine and settings Privacy Guard uses"""
+    global motion_engine
+    if motion_engine is None:
+        motion_engine = MotionEngine.from_config(Config())
+    return motion_engine.process(frame).boxes
 
 def detect_faces(frame, face_cascade):
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
@@ -99,14 +98,17 @@ def measure_callback(event, x, y, flags, param):
             measuring = False
 
 def test_specific_camera(camera_index):
+    """Test a camera index or any frame source spec (video file, image folder, synthetic)"""
     global measuring, measure_start, measure_end, last_line_length
 
     print(f"\n🔍 Testing Camera {camera_index}...")
 
-    cap = cv2.VideoCapture(camera_index)
-    if not cap.isOpened():
+    cap = open_frame_source(camera_index, loop=True, paced=True)
+    if cap is None:
         print(f"❌ Cannot access camera {camera_index}")
         return False
+    # File-name safe tag for screenshots when testing a path-based source
+    file_tag = re.sub(r'[^A-Za-z0-9]+', '_', os.path.basename(str(camera_index)))
 
     print("Keys: [q]=quit [s]=screenshot [b]=burst [c]=color/gray/edge [r]=res [i]=info [f]=face [m]=measure")
 
@@ -180,7 +182,7 @@ def test_specific_camera(camera_index):
         if key == ord('q'):
             break
         elif key == ord('s'):
-            filename = f"camera_{camera_index}_shot_{frame_count}.jpg"
+            filename = f"camera_{file_tag}_shot_{frame_count}.jpg"
             cv2.imwrite(filename, frame)
             print(f"📸 Screenshot saved: {filename}")
         elif key == ord('b'):
@@ -217,7 +219,7 @@ def test_specific_camera(camera_index):
             measuring, measure_start, measure_end, last_line_length = True, None, None, None
 
         if auto_burst and frame_count % 10 == 0:
-            filename = f"camera_{camera_index}_burst_{burst_counter}.jpg"
+            filename = f"camera_{file_tag}_burst_{burst_counter}.jpg"
             cv2.imwrite(filename, frame)
             print(f"🖼️ Burst saved: {filename}")
             burst_counter += 1
@@ -232,9 +234,12 @@ def test_specific_camera(camera_index):
             print(f"Burst duration: {elapsed:.2f} sec, {burst_counter} burst images saved")
     return True
 
-def interactive_camera_test():
+def interactive_camera_test(source_spec=None):
     print("🚀 Privacy Guard - Camera Test Utility")
     print("=" * 50)
+    if source_spec is not None:
+        test_specific_camera(source_spec)
+        return
     if not test_all_cameras():
         return
     while True:
@@ -250,7 +255,7 @@ def interactive_camera_test():
             except ValueError:
                 print("❌ Invalid camera index")
         elif choice == "2":
-            test_all_cameras()
+            test_all_cameras(refresh=True)
         elif choice == "3":
             break
         else:
@@ -258,10 +263,9 @@ def interactive_camera_test():
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        try:
-            camera_index = int(sys.argv[1])
-            test_specific_camera(camera_index)
-        except ValueError:
-            print("Usage: python test_camera.py [camera_index]")
+        if sys.argv[1] in ('-h', '--help'):
+            print("Usage: python test_camera.py [camera_index | video_file | image_folder | synthetic]")
+        else:
+            test_specific_camera(sys.argv[1])
     else:
         interactive_camera_test()
@@ -2,26 +2,163 @@
 Utility functions for Privacy Guard System
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import subprocess
+import threading
 import psutil
 import time
-from datetime import datetime
+from functools import lru_cache
 
-def setup_logging(log_level="INFO"):
-    """Setup logging configuration"""
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_log_listener = None
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Rotates when the file exceeds `max_bytes` or the day changes.
+
+    Within a day, size rollovers keep up to `backup_count` numbered backups (.1
+    newest). When the day changes the log and its numbered backups are renamed
+    with the date (privacy_guard.log.20240131, .20240131.1, ...), so earlier
+    days are never pushed out by size rotation; dated files older than
+    `retention_days` are deleted.
+    """
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=5, retention_days=14):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.retention_days = retention_days
+        # A log left by an earlier run on another day rolls over on the first record
+        self.day = time.strftime('%Y%m%d', time.localtime(os.path.getmtime(self.baseFilename))) \
+            if os.path.exists(self.baseFilename) else time.strftime('%Y%m%d')
+
+    def shouldRollover(self, record):
+        if time.strftime('%Y%m%d') != self.day:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        today = time.strftime('%Y%m%d')
+        if today == self.day:
+            super().doRollover()
+            return
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        dated = f"{self.baseFilename}.{self.day}"
+        while os.path.exists(dated):  # e.g. the clock was set back
+            dated += "_"
+        for i in range(self.backupCount, 0, -1):
+            backup = f"{self.baseFilename}.{i}"
+            if os.path.exists(backup):
+                os.replace(backup, f"{dated}.{i}")
+        if os.path.exists(self.baseFilename):
+            os.replace(self.baseFilename, dated)
+        self.day = today
+        if not self.delay:
+            self.stream = self._open()
+        self.remove_expired()
+
+    def remove_expired(self):
+        if not self.retention_days:
+            return
+        directory = os.path.dirname(self.baseFilename)
+        cutoff = time.time() - self.retention_days * 86400
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.startswith('privacy_guard') and path != self.baseFilename \
+                    and os.path.getmtime(path) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimiter:
+    """Lets each key through at most `burst` times per `interval` seconds and counts the rest"""
+
+    def __init__(self, interval=10.0, burst=1):
+        self.interval = interval
+        self.burst = burst
+        self.windows = {}
+        self.suppressed = {}
+
+    def allow(self, key):
+        """Returns (allowed, suppressed_since_last_allowed)"""
+        now = time.monotonic()
+        window = self.windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            window = self.windows[key] = [now, 0]
+        if window[1] >= self.burst:
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            return False, 0
+        window[1] += 1
+        return True, self.suppressed.pop(key, 0)
+
+
+class RateLimitFilter(logging.Filter):
+    """Limits each logging call site to `burst` records per `interval` seconds"""
+
+    def __init__(self, interval=10.0, burst=5):
+        super().__init__()
+        self.limiter = RateLimiter(interval, burst)
+
+    def filter(self, record):
+        if not self.limiter.interval:
+            return True
+        allowed, suppressed = self.limiter.allow((record.pathname, record.lineno))
+        if allowed and suppressed:
+            record.msg = f"{record.msg} (+{suppressed} similar messages suppressed)"
+        return allowed
+
+
+def setup_logging(log_level="INFO", max_mb=10, backup_count=5, retention_days=14,
+                  rate_limit_seconds=10, queue_size=10000):
+    """Setup logging configuration.
+
+    Callers only enqueue records; a QueueListener thread formats them and does
+    the console and rotating file I/O. Repeated messages are rate limited.
+    Later calls only update the level.
+    """
+    global _log_listener
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, log_level))
+    if _log_listener is not None:
+        return logging.getLogger(__name__)
     if not os.path.exists("logs"):
         os.makedirs("logs")
-    log_file = f"logs/privacy_guard_{datetime.now().strftime('%Y%m%d')}.log"
-    logging.basicConfig(
-        level=getattr(logging, log_level),
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingLogHandler("logs/privacy_guard.log", int(max_mb * 1024 * 1024),
+                                      backup_count, retention_days)
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+    log_queue = queue.Queue(queue_size)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(rate_limit_seconds))
+    root.addHandler(queue_handler)
+    _log_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                                   respect_handler_level=True)
+    _log_listener.start()
+    # Flush queued records on exit
+    atexit.register(_log_listener.stop)
+    file_handler.remove_expired()
     return logging.getLogger(__name__)
 
 def check_dependencies():
@@ -35,21 +172,10 @@ def check_dependencies():
             missing.append(module)
     return missing
 
-def get_available_cameras():
-    """Detect available cameras"""
-    import cv2
-    cameras = []
-    for i in range(5):  # Check first 5 camera indices
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            cameras.append({
-                'index': i,
-                'name': f'Camera {i}',
-                'resolution': (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-                               int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
-            })
-            cap.release()
-    return cameras
+def get_available_cameras(refresh=False, skip=()):
+    """Detect available cameras (probed in parallel, cached in config/camera_cache.json)"""
+    from camera_discovery import discover_cameras
+    return discover_cameras(refresh=refresh, skip=skip)
 
 def close_application_by_name(app_name):
     """Close specific application by name"""
@@ -60,14 +186,113 @@ def close_application_by_name(app_name):
     except:
         return False
 
+@lru_cache(maxsize=32)
+def _compile_names(names):
+    return frozenset(os.path.basename(name).lower() for name in names)
+
+def compile_names(names):
+    """Lowercased executable-name set, built once per distinct list"""
+    return _compile_names(tuple(names))
+
+class ProcessIndex:
+    """Lowercased process name -> PIDs, kept current by a background thread.
+
+    Each refresh only diffs the PID set and looks up names of new PIDs, so it stays
+    cheap with hundreds of processes; a full rebuild every `rebuild_every`
+    background refreshes catches PIDs reused between refreshes.
+    """
+
+    def __init__(self, interval=2.0, rebuild_every=30):
+        self.interval = interval
+        self.rebuild_every = rebuild_every
+        self.lock = threading.Lock()
+        self.names = {}
+        self.pid_names = {}
+        self.refreshes = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def refresh(self, rebuild=True):
+        """Update the index from the current PID set; returns (added, removed).
+
+        Only refreshes with `rebuild` set count toward the periodic full rebuild,
+        which builds new maps aside and swaps them in, so find() never sees an
+        empty index.
+        """
+        pids = set(psutil.pids())
+        with self.lock:
+            if rebuild:
+                self.refreshes += 1
+            full = rebuild and self.refreshes % self.rebuild_every == 0
+            known = set() if full else set(self.pid_names)
+        added = {}
+        for pid in pids - known:
+            try:
+                added[pid] = psutil.Process(pid).name().lower()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        if full:
+            names = {}
+            for pid, name in added.items():
+                names.setdefault(name, set()).add(pid)
+            with self.lock:
+                previous = set(self.pid_names)
+                self.pid_names, self.names = added, names
+            return len(set(added) - previous), len(previous - set(added))
+        gone = known - pids
+        with self.lock:
+            for pid in gone:
+                name = self.pid_names.pop(pid, None)
+                if name is not None:
+                    self.names[name].discard(pid)
+                    if not self.names[name]:
+                        del self.names[name]
+            for pid, name in added.items():
+                self.pid_names[pid] = name
+                self.names.setdefault(name, set()).add(pid)
+        return len(added), len(gone)
+
+    def find(self, names):
+        """Live psutil.Process objects whose lowercased name is in `names`"""
+        with self.lock:
+            matches = [(pid, name) for name in names for pid in self.names.get(name, ())]
+        processes = []
+        for pid, name in matches:
+            try:
+                proc = psutil.Process(pid)
+                if proc.name().lower() == name:  # guard against PID reuse
+                    processes.append(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return processes
+
+    def start(self):
+        self.refresh()
+        self.thread = threading.Thread(target=self.run, name="PrivacyGuardProcessIndex", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Process index refresh failed: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(self.interval + 1)
+            self.thread = None
+
 def close_applications_by_list(app_list, protected_list):
     """Close multiple applications safely"""
     closed_apps = []
+    protected = compile_names(protected_list)
     for proc in psutil.process_iter(['pid', 'name']):
         try:
             process_name = proc.info['name']
             if (process_name in app_list and 
-                process_name.lower() not in [p.lower() for p in protected_list]):
+                process_name.lower() not in protected):
                 proc.terminate()
                 closed_apps.append(process_name)
         except (psutil.NoSuchProcess, psutil.AccessDenied):
@@ -105,22 +330,82 @@ def show_notification(title, message):
     except:
         print(f"Notification: {title} - {message}")
 
-def close_and_minimize(app_list, protected_list, close_names):
+def request_termination(processes):
+    """Send terminate to every process without waiting; returns the pending state for await_termination"""
+    state = {'start': time.perf_counter(), 'processes': processes, 'names': {}, 'exited': {}}
+    for proc in processes:
+        try:
+            state['names'][proc.pid] = proc.name()
+            proc.terminate()
+        except psutil.NoSuchProcess:
+            state['exited'][proc.pid] = ('terminated', 0.0)
+        except psutil.AccessDenied:
+            state['exited'][proc.pid] = ('denied', 0.0)
+    return state
+
+def await_termination(state, timeout=2.0, kill_timeout=1.0):
+    """Wait with a deadline for processes from request_termination and kill survivors.
+
+    Returns a report with per-process time-to-exit ('terminated', 'killed' or
+    'survived') and the total time until all were gone, which is bounded by
+    timeout + kill_timeout after the request.
+    """
+    start, names, exited = state['start'], state['names'], state['exited']
+
+    def on_terminate(proc):
+        exited.setdefault(proc.pid, (stage, time.perf_counter() - start))
+
+    stage = 'terminated'
+    pending = [proc for proc in state['processes'] if proc.pid not in exited]
+    remaining = max(0.0, timeout - (time.perf_counter() - start))
+    _, alive = psutil.wait_procs(pending, timeout=remaining, callback=on_terminate)
+    if alive:
+        stage = 'killed'
+        for proc in alive:
+            try:
+                proc.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        _, alive = psutil.wait_procs(alive, timeout=kill_timeout, callback=on_terminate)
+    elapsed = time.perf_counter() - start
+    for proc in alive:
+        exited[proc.pid] = ('survived', elapsed)
+    return {
+        'elapsed': elapsed,
+        'processes': [(names.get(pid, '?'), pid, outcome, seconds)
+                      for pid, (outcome, seconds) in exited.items()],
+    }
+
+def terminate_processes(processes, timeout=2.0, kill_timeout=1.0):
+    """Terminate processes together, wait with a deadline and kill survivors (see await_termination)"""
+    return await_termination(request_termination(processes), timeout, kill_timeout)
+
+def format_termination_report(report, minimized_after=None):
+    """One-line summary of a terminate_processes report"""
+    parts = [f"{name} (pid {pid}) {outcome} in {seconds * 1000:.0f} ms"
+             for name, pid, outcome, seconds in report['processes']]
+    prefix = f"windows minimized after {minimized_after * 1000:.0f} ms, " if minimized_after is not None else ""
+    return prefix + f"screen clean after {report['elapsed'] * 1000:.0f} ms: " + ", ".join(parts)
+
+def close_and_minimize(app_list, protected_list, close_names, process_index=None, timeout=2.0):
     """Close only close_names apps (by EXE name), minimize all other user-visible windows (but don't minimize closed ones)"""
     import win32gui
     import win32con
     closed_apps = []
     minimized_titles = []
-    close_names_lower = [os.path.basename(name).lower() for name in close_names]
+    close_names_lower = compile_names(close_names)
     # Close all processes named in close_names ONLY
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            process_name = proc.info['name'].lower()
-            if process_name in close_names_lower:
-                proc.terminate()
-                closed_apps.append(proc.info['name'])
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
+    if process_index is not None:
+        # Refresh picks up processes started since the last background pass; the
+        # full rebuild is left to the background thread
+        process_index.refresh(rebuild=False)
+        targets = process_index.find(close_names_lower)
+    else:
+        targets = [proc for proc in psutil.process_iter(['pid', 'name'])
+                   if (proc.info['name'] or '').lower() in close_names_lower]
+    # Ask the targets to exit, but minimize before waiting for them so a slow or
+    # hung target does not keep the other windows on screen
+    pending = request_termination(targets) if targets else None
 
     # Now minimize all windows except the ones in close_names
     def callback(hwnd, hwnds):
@@ -137,32 +422,43 @@ def close_and_minimize(app_list, protected_list, close_names):
     for h in hwnds:
         win32gui.ShowWindow(h, win32con.SW_MINIMIZE)
         minimized_titles.append(win32gui.GetWindowText(h))
+    if pending is not None:
+        minimized_after = time.perf_counter() - pending['start']
+        report = await_termination(pending, timeout)
+        closed_apps = [name for name, _, outcome, _ in report['processes']
+                       if outcome in ('terminated', 'killed')]
+        logging.getLogger(__name__).info(
+            f"Force close: {format_termination_report(report, minimized_after)}")
     return closed_apps, minimized_titles
 
-def launch_or_activate_app(app_name=None):
+def launch_or_activate_app(app_name=None, process_index=None):
     """
     Directly launches comet.exe from absolute path. (No PATH tricks, works always).
     """
     comet_path = r"C:\Users\globa\AppData\Local\Perplexity\Comet\Application\comet.exe"   
     try:
         # Preferably bring to front if already running
-        for proc in psutil.process_iter(['pid', 'name']):
-            if proc.info['name'].lower() == "comet.exe":
-                try:
-                    import win32gui, win32process
-                    pid = proc.info['pid']
-                    def enumHandler(hwnd, lParam):
-                        try:
-                            _, found_pid = win32process.GetWindowThreadProcessId(hwnd)
-                            if found_pid == pid:
-                                win32gui.ShowWindow(hwnd, 9)   # SW_RESTORE
-                                win32gui.SetForegroundWindow(hwnd)
-                        except Exception:
-                            pass
-                    win32gui.EnumWindows(enumHandler, None)
-                    return True
-                except Exception:
-                    pass
+        if process_index is not None:
+            running = process_index.find(("comet.exe",))
+        else:
+            running = [proc for proc in psutil.process_iter(['pid', 'name'])
+                       if proc.info['name'].lower() == "comet.exe"]
+        for proc in running:
+            try:
+                import win32gui, win32process
+                pid = proc.pid
+                def enumHandler(hwnd, lParam):
+                    try:
+                        _, found_pid = win32process.GetWindowThreadProcessId(hwnd)
+                        if found_pid == pid:
+                            win32gui.ShowWindow(hwnd, 9)   # SW_RESTORE
+                            win32gui.SetForegroundWindow(hwnd)
+                    except Exception:
+                        pass
+                win32gui.EnumWindows(enumHandler, None)
+                return True
+            except Exception:
+                pass
         os.startfile(comet_path)
         return True
     except Exception as e: